@@ -15,14 +15,171 @@ from tkinter import (
     colorchooser,
 )
 import json
-import pygame
+import re
+import unicodedata
 import random
-import subprocess
 import tempfile
-import requests
 import time
 import shutil
+import bisect
+import itertools
+import threading
+import queue
 import traceback
+import hashlib
+import struct
+import zlib
+import contextlib
+import functools
+import collections
+
+
+class PerformanceMonitor:
+    """
+    Registra quanto tempo as etapas da inicialização e as operações mais pesadas levam.
+    As etapas medidas até o fim da inicialização formam o relatório de abertura; todas as
+    medições também entram em estatísticas acumuladas (quantidade, média e máximo).
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.startup_total = None
+        self.phases = []
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Cronometra o bloco de código como uma etapa com o nome informado."""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - begin)
+
+    def timed(self, name):
+        """Decorador que cronometra cada chamada da função com o nome informado."""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.phase(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record(self, name, duration):
+        """Registra uma medição (em segundos)."""
+        with self.lock:
+            if self.startup_total is None:
+                self.phases.append((name, duration))
+            count, total, longest = self.stats.get(name, (0, 0.0, 0.0))
+            self.stats[name] = (count + 1, total + duration, max(longest, duration))
+
+    def finish_startup(self):
+        """Marca o fim da inicialização (janela exibida e loop de eventos livre)."""
+        if self.startup_total is None:
+            self.startup_total = time.perf_counter() - self.start
+
+    def report(self):
+        """
+        Monta o relatório de desempenho.
+
+        Retorna:
+            str: Etapas da inicialização e estatísticas acumuladas de cada operação medida.
+        """
+        with self.lock:
+            phases = list(self.phases)
+            stats = sorted(self.stats.items(), key=lambda item: -item[1][1])
+        total = self.startup_total
+        if total is None:
+            total = time.perf_counter() - self.start
+        lines = [f"Tempo de inicialização: {total * 1000:.0f} ms"]
+        for name, duration in phases:
+            lines.append(f"  {name}: {duration * 1000:.1f} ms")
+        lines.append("")
+        lines.append("Operações (chamadas / média / máximo / total):")
+        for name, (count, elapsed, longest) in stats:
+            lines.append(
+                f"  {name}: {count} / {elapsed / count * 1000:.1f} ms / "
+                f"{longest * 1000:.1f} ms / {elapsed * 1000:.0f} ms"
+            )
+        return "\n".join(lines)
+
+    def write_log(self, path):
+        """
+        Acrescenta o relatório atual ao arquivo de log, iniciando um novo arquivo quando ele fica grande.
+
+        Parâmetros:
+            path (str): Caminho do arquivo de log.
+        """
+        try:
+            if (
+                os.path.exists(path)
+                and os.path.getsize(path) > PERFORMANCE_LOG_MAX_BYTES
+            ):
+                os.replace(path, path + ".old")
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n")
+                file.write(self.report() + "\n\n")
+        except OSError as e:
+            print(f"Não foi possível gravar o log de desempenho: {e}")
+
+
+perf_monitor = PerformanceMonitor()
+
+
+class LazyModule:
+    """
+    Adia a importação de um módulo pesado até o primeiro acesso a um de seus atributos.
+
+    Parâmetros:
+        name (str): Nome do módulo (usado no relatório de inicialização).
+        loader (callable): Função que importa e retorna o módulo.
+    """
+
+    def __init__(self, name, loader):
+        self._name = name
+        self._loader = loader
+        self._module = None
+
+    @property
+    def loaded(self):
+        """Indica se o módulo já foi importado."""
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            with perf_monitor.phase(f"import {self._name}"):
+                self._module = self._loader()
+        return getattr(self._module, attr)
+
+
+def _import_pygame():
+    # Import dentro da função (e não via importlib) para que o PyInstaller continue incluindo o pacote
+    import pygame
+
+    return pygame
+
+
+def _import_requests():
+    import requests
+
+    return requests
+
+
+def _import_sqlite3():
+    import sqlite3
+
+    return sqlite3
+
+
+pygame = LazyModule("pygame", _import_pygame)
+requests = LazyModule("requests", _import_requests)
+# Só usado com texts_storage = "sqlite"
+sqlite3 = LazyModule("sqlite3", _import_sqlite3)
 
 
 def get_resource_path(relative_path):
@@ -36,12 +193,63 @@ def get_resource_path(relative_path):
 
 
 # Constantes para cores e caminhos de arquivo
+APP_VERSION = "3.5"
 DEFAULT_BG_COLOR = "#FFFFFF"  # Cor de fundo padrão
 DEFAULT_WINDOW_SIZE = "800x600+100+100"
 DEFAULT_BG_IMAGE_PATH = "background.png"
 CONFIG_FILE = "config.txt"
 TEXTS_FILE = "texts.json"
+TEXTS_DB_FILE = "texts.db"
 NOTEPAD_FILE = "notepad.json"
+NOTEPAD_JOURNAL_FILE = "notepad.journal"
+NOTEPAD_JOURNAL_MIN_BYTES = 256 * 1024  # Tamanho mínimo do diário antes da consolidação
+NOTEPAD_AUTOSAVE_SECONDS = 30  # Intervalo do salvamento automático (0 desativa)
+UPDATE_CHECK_TIMEOUT = 5  # Segundos de espera pela resposta do GitHub
+UPDATE_CHECK_INTERVAL_HOURS = 12  # Intervalo mínimo entre verificações automáticas
+UPDATE_CHANNELS = ("stable", "beta")
+VERSION_CACHE_FILE = "version_cache.json"  # Último version.json recebido (com ETag)
+# Ordem dos pré-lançamentos na comparação de versões
+PRE_RELEASE_ORDER = {"alpha": 0, "a": 0, "beta": 1, "b": 1, "rc": 2, "c": 2}
+CONFIG_SAVE_INTERVAL_MS = 1000  # Intervalo mínimo entre gravações do config.txt
+PERFORMANCE_LOG_FILE = "performance.log"
+# Acima disso o log atual vira performance.log.old
+PERFORMANCE_LOG_MAX_BYTES = 512 * 1024
+PROFILE_ENV_VAR = "SUPORTEAPP_PROFILE"  # "1" ou caminho do arquivo .prof do cProfile
+# Pastas _MEI que falharam e quando tentar de novo
+CLEANUP_STATE_FILE = "cleanup_state.json"
+CLEANUP_TIME_BUDGET = 2.0  # Segundos de limpeza por execução
+CLEANUP_DELAY_MS = 3000  # Espera após abrir a janela antes de iniciar a limpeza
+# Intervalo, em segundos, após a primeira falha (dobra a cada falha)
+CLEANUP_RETRY_BASE = 3600
+CLEANUP_RETRY_MAX = 7 * 24 * 3600
+THREAD_PRIORITY_LOWEST = -2
+SNIPPET_API_PORT = 8765  # Porta padrão da API local de textos (--servir)
+# Textos indexados por etapa da construção do índice de busca em segundo plano
+SEARCH_INDEX_BATCH = 200
+# Espera após o último redimensionamento antes de ajustar o fundo
+BG_RESIZE_DEBOUNCE_MS = 200
+UPDATE_DOWNLOAD_TIMEOUT = 30  # Segundos sem receber dados antes de desistir do bloco
+UPDATE_DOWNLOAD_RETRIES = 3  # Retomadas automáticas de um download interrompido
+UPDATE_CHUNK_SIZE = 64 * 1024
+DELTA_MAGIC = b"SADELTA1"  # Cabeçalho dos patches binários de atualização
+DELTA_BLOCK_SIZE = 64
+
+# Layout da grade de botões (organizada em colunas de BUTTONS_PER_COLUMN botões)
+GRID_MARGIN = 10
+BUTTON_WIDTH = 150
+BUTTON_HEIGHT = 30
+BUTTON_PADDING = 5
+COLUMN_WIDTH = 185
+BUTTONS_PER_COLUMN = 10
+# Limites do histórico de desfazer do bloco de notas
+NOTEPAD_UNDO_STEPS = 200
+NOTEPAD_UNDO_MAX_KB = 2048
+# Jogo Space Snake
+SNAKE_FREE_CELL_ATTEMPTS = 32  # Sorteios antes de listar todas as células livres
+SNAKE_MAX_CATCHUP_STEPS = 5  # Passos de lógica recuperados por chamada quando atrasado
+SNAKE_MAX_SKIPPED_FRAMES = 5  # Quadros seguidos sem desenho antes de forçar um
+SNAKE_STATS_WINDOW = 20  # Passos usados na média de FPS e jitter
+SNAKE_TWINKLE_STARS = 12  # Itens reaproveitados para a animação das estrelas do título
 
 
 def handle_rmtree_error(func, path, exc_info):
@@ -55,10 +263,99 @@ def handle_rmtree_error(func, path, exc_info):
         raise
 
 
-def cleanup_old_temp_dirs():
+def atomic_write_text(path, text, encoding=None, newline=None):
+    """
+    Grava um texto de forma atômica: escreve em um arquivo temporário na mesma pasta
+    e só então substitui o original, evitando arquivos corrompidos se o programa cair no meio da gravação.
+
+    Parâmetros:
+        path (str): Caminho do arquivo de destino.
+        text (str): Conteúdo do arquivo.
+        encoding (str): Codificação do arquivo (padrão do sistema se None).
+        newline (str): Conversão de quebras de linha, como em open().
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline=newline) as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path, data, encoding=None, **dump_kwargs):
+    """
+    Grava dados em JSON de forma atômica (ver atomic_write_text).
+
+    Parâmetros:
+        path (str): Caminho do arquivo de destino.
+        data: Dados serializáveis em JSON.
+        encoding (str): Codificação do arquivo (padrão do sistema se None).
+        **dump_kwargs: Argumentos repassados para json.dumps.
+    """
+    atomic_write_text(path, json.dumps(data, **dump_kwargs), encoding=encoding)
+
+
+def _lower_thread_priority():
+    """Reduz a prioridade da thread atual no Windows, para que a limpeza não dispute CPU com a interface."""
+    if os.name != "nt":
+        return
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_LOWEST)
+    except Exception as e:
+        print(f"[CLEANUP] Não foi possível reduzir a prioridade da thread: {e}")
+
+
+def _remove_tree(path, deadline):
+    """
+    Exclui um diretório de baixo para cima, parando quando o prazo se esgota.
+    O que já foi apagado continua apagado, e a próxima execução retoma de onde parou.
+
+    Parâmetros:
+        path (str): Diretório a excluir.
+        deadline (float): Instante (time.monotonic) em que a exclusão deve parar.
+
+    Retorna:
+        bool: True se o diretório foi totalmente excluído, False se o prazo acabou.
+
+    Exceções:
+        OSError: Se algum arquivo ou pasta não puder ser excluído.
+    """
+    for current, dirs, files in os.walk(path, topdown=False):
+        for name in files:
+            if time.monotonic() > deadline:
+                return False
+            try:
+                os.remove(os.path.join(current, name))
+            except PermissionError:
+                handle_rmtree_error(os.remove, os.path.join(current, name), None)
+        for name in dirs:
+            os.rmdir(os.path.join(current, name))
+    os.rmdir(path)
+    return True
+
+
+def cleanup_old_temp_dirs(time_budget=CLEANUP_TIME_BUDGET):
     """
     Limpa diretórios temporários antigos (_MEI*) no diretório do executável.
-    Essa função é executada no início do programa para evitar acúmulo de pastas temporárias.
+    Roda em segundo plano depois que a janela é exibida, limitada a time_budget segundos por execução.
+    Diretórios que falham (ex.: arquivos em uso) são registrados em cleanup_state.json e só são
+    tentados de novo após um intervalo que dobra a cada falha.
+
+    Parâmetros:
+        time_budget (float): Tempo máximo, em segundos, gasto nesta execução.
     """
     try:
         if not getattr(sys, "frozen", False):
@@ -66,26 +363,269 @@ def cleanup_old_temp_dirs():
 
         exe_dir = os.path.dirname(sys.executable)
         current_temp_dir = getattr(sys, "_MEIPASS", None)
+        state_path = os.path.join(exe_dir, CLEANUP_STATE_FILE)
+        deadline = time.monotonic() + time_budget
+        now = time.time()
 
-        for entry in os.listdir(exe_dir):
-            entry_path = os.path.join(exe_dir, entry)
+        try:
+            with open(state_path, "r", encoding="utf-8") as file:
+                failed = json.load(file).get("failed", {})
+        except (OSError, ValueError, AttributeError):
+            failed = {}
+        state_changed = False
+
+        leftovers = [
+            entry
+            for entry in os.listdir(exe_dir)
+            if entry.startswith("_MEI")
+            and os.path.join(exe_dir, entry) != current_temp_dir
+            and os.path.isdir(os.path.join(exe_dir, entry))
+        ]
+        # Registros de pastas que já não existem são descartados
+        for entry in list(failed):
+            if entry not in leftovers:
+                del failed[entry]
+                state_changed = True
+
+        for entry in leftovers:
+            record = failed.get(entry)
+            if record and record["next_retry"] > now:
+                continue  # Falhou recentemente; aguarda o intervalo de nova tentativa
+            if time.monotonic() > deadline:
+                print(
+                    "[CLEANUP] Tempo esgotado; o restante fica para a próxima execução."
+                )
+                break
 
-            if (
-                os.path.isdir(entry_path)
-                and entry.startswith("_MEI")
-                and entry_path != current_temp_dir
-            ):
-                print(f"[CLEANUP] Tentando excluir: {entry_path}")
-                try:
-                    shutil.rmtree(entry_path, ignore_errors=True)
-                    print(f"[CLEANUP] Diretório excluído: {entry_path}")
-                except Exception as e:
-                    print(f"[CLEANUP] Erro ao excluir {entry_path}: {str(e)}")
+            entry_path = os.path.join(exe_dir, entry)
+            print(f"[CLEANUP] Tentando excluir: {entry_path}")
+            try:
+                if not _remove_tree(entry_path, deadline):
+                    print(
+                        "[CLEANUP] Tempo esgotado; o restante fica para a próxima execução."
+                    )
+                    break
+                print(f"[CLEANUP] Diretório excluído: {entry_path}")
+                if failed.pop(entry, None):
+                    state_changed = True
+            except OSError as e:
+                attempts = (record or {}).get("attempts", 0) + 1
+                delay = min(CLEANUP_RETRY_BASE * 2 ** (attempts - 1), CLEANUP_RETRY_MAX)
+                failed[entry] = {"attempts": attempts, "next_retry": now + delay}
+                state_changed = True
+                print(f"[CLEANUP] Erro ao excluir {entry_path}: {str(e)}")
+
+        if state_changed:
+            atomic_write_json(
+                state_path, {"failed": failed}, encoding="utf-8", indent=4
+            )
 
     except Exception as main_error:
         print(f"[CLEANUP] Erro crítico durante a limpeza: {str(main_error)}")
 
 
+def start_background_cleanup():
+    """Executa cleanup_old_temp_dirs em uma thread de baixa prioridade."""
+
+    def worker():
+        _lower_thread_priority()
+        with perf_monitor.phase("cleanup_old_temp_dirs (thread)"):
+            cleanup_old_temp_dirs()
+
+    threading.Thread(target=worker, name="cleanup", daemon=True).start()
+
+
+def parse_version(version):
+    """
+    Converte uma versão ("3.10", "v3.6.1", "3.6-beta.2", "4.0rc1") em uma tupla comparável.
+    Zeros finais são ignorados ("3.5" == "3.5.0") e pré-lançamentos vêm antes da versão final.
+
+    Parâmetros:
+        version (str): Texto da versão.
+
+    Retorna:
+        tuple: (números da versão, (é final, ordem do pré-lançamento, número do pré-lançamento)).
+
+    Exceções:
+        ValueError: Se o texto não começar com uma versão numérica.
+    """
+    match = re.fullmatch(
+        r"v?(\d+(?:\.\d+)*)(?:[-.]?([a-z]+)[-.]?(\d*))?", str(version).strip().lower()
+    )
+    if not match:
+        raise ValueError(f"Versão inválida: {version!r}")
+    release = tuple(int(part) for part in match.group(1).split("."))
+    while len(release) > 1 and release[-1] == 0:
+        release = release[:-1]
+    label, number = match.group(2), match.group(3)
+    if label:
+        pre_release = (0, PRE_RELEASE_ORDER.get(label, -1), int(number or 0))
+    else:
+        pre_release = (1, 0, 0)
+    return release, pre_release
+
+
+def file_sha256(path):
+    """Calcula o SHA-256 de um arquivo lendo-o em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(UPDATE_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _forward_match_length(a, a_start, b, b_start):
+    """Conta quantos bytes coincidem entre a[a_start:] e b[b_start:], comparando em blocos."""
+    step = 4096
+    length = 0
+    limit = min(len(a) - a_start, len(b) - b_start)
+    while length < limit:
+        size = min(step, limit - length)
+        chunk_a = a[a_start + length : a_start + length + size]
+        chunk_b = b[b_start + length : b_start + length + size]
+        if chunk_a != chunk_b:
+            return length + _common_prefix_length(chunk_a, chunk_b)
+        length += size
+    return length
+
+
+def build_delta(old_path, new_path, delta_path, block_size=DELTA_BLOCK_SIZE):
+    """
+    Gera um patch binário que transforma old_path em new_path.
+    O patch é uma sequência de cópias de trechos do arquivo antigo e de dados novos, compactada com zlib.
+    Usado na publicação de uma versão, para que os clientes baixem só o que mudou.
+
+    Parâmetros:
+        old_path (str): Executável da versão anterior.
+        new_path (str): Executável da nova versão.
+        delta_path (str): Caminho do patch a ser gravado.
+        block_size (int): Tamanho dos blocos usados para localizar trechos repetidos.
+
+    Retorna:
+        dict: Estatísticas do patch (bytes copiados, bytes novos e tamanho final).
+    """
+    with open(old_path, "rb") as file:
+        old = file.read()
+    with open(new_path, "rb") as file:
+        new = file.read()
+
+    # Índice dos blocos alinhados do arquivo antigo
+    index = {}
+    for offset in range(0, len(old) - block_size + 1, block_size):
+        index.setdefault(old[offset : offset + block_size], offset)
+
+    ops = []  # (offset no antigo, tamanho) para cópias; bytes para dados novos
+    literal_start = 0
+    pos = 0
+    while pos <= len(new) - block_size:
+        old_offset = index.get(new[pos : pos + block_size])
+        if old_offset is None:
+            pos += 1
+            continue
+
+        # Estende a coincidência para frente e, dentro do trecho ainda não coberto, para trás
+        length = block_size + _forward_match_length(
+            old, old_offset + block_size, new, pos + block_size
+        )
+        back_limit = min(block_size, pos - literal_start, old_offset)
+        back = _common_suffix_length(
+            old[old_offset - back_limit : old_offset],
+            new[pos - back_limit : pos],
+            back_limit,
+        )
+        if pos - back > literal_start:
+            ops.append(new[literal_start : pos - back])
+        copy_offset, copy_length = old_offset - back, length + back
+        if ops and isinstance(ops[-1], tuple) and sum(ops[-1]) == copy_offset:
+            ops[-1] = (ops[-1][0], ops[-1][1] + copy_length)
+        else:
+            ops.append((copy_offset, copy_length))
+        pos += length
+        literal_start = pos
+    if literal_start < len(new):
+        ops.append(new[literal_start:])
+
+    compressor = zlib.compressobj(9)
+    copied = inserted = 0
+    with open(delta_path, "wb") as file:
+        file.write(DELTA_MAGIC)
+        header = hashlib.sha256(old).digest() + struct.pack("<Q", len(new))
+        file.write(compressor.compress(header))
+        for op in ops:
+            if isinstance(op, tuple):
+                file.write(compressor.compress(b"C" + struct.pack("<QQ", *op)))
+                copied += op[1]
+            else:
+                file.write(compressor.compress(b"I" + struct.pack("<Q", len(op)) + op))
+                inserted += len(op)
+        file.write(compressor.flush())
+        size = file.tell()
+    return {"copied": copied, "inserted": inserted, "size": size}
+
+
+def apply_delta(old_path, delta_path, out_path):
+    """
+    Aplica um patch gerado por build_delta sobre o arquivo antigo.
+
+    Parâmetros:
+        old_path (str): Arquivo de origem (o executável em uso).
+        delta_path (str): Patch baixado.
+        out_path (str): Arquivo reconstruído a ser gravado.
+
+    Exceções:
+        ValueError: Se o patch for inválido ou não corresponder ao arquivo de origem.
+    """
+    with open(delta_path, "rb") as file:
+        if file.read(len(DELTA_MAGIC)) != DELTA_MAGIC:
+            raise ValueError("Arquivo de patch inválido")
+        try:
+            data = zlib.decompress(file.read())
+        except zlib.error as e:
+            raise ValueError(f"Patch corrompido: {e}")
+
+    if len(data) < 40:
+        raise ValueError("Patch incompleto")
+    source_digest, (new_size,) = data[:32], struct.unpack_from("<Q", data, 32)
+    if bytes.fromhex(file_sha256(old_path)) != source_digest:
+        raise ValueError("O patch não corresponde à versão instalada")
+
+    pos = 40
+    written = 0
+    with open(old_path, "rb") as old, open(out_path, "wb") as out:
+        while pos < len(data):
+            kind = data[pos : pos + 1]
+            if kind == b"C":
+                offset, length = struct.unpack_from("<QQ", data, pos + 1)
+                pos += 17
+                old.seek(offset)
+                while length:
+                    chunk = old.read(min(length, UPDATE_CHUNK_SIZE))
+                    if not chunk:
+                        raise ValueError(
+                            "Patch referencia dados fora do arquivo de origem"
+                        )
+                    out.write(chunk)
+                    written += len(chunk)
+                    length -= len(chunk)
+            elif kind == b"I":
+                (length,) = struct.unpack_from("<Q", data, pos + 1)
+                pos += 9
+                chunk = data[pos : pos + length]
+                if len(chunk) != length:
+                    raise ValueError("Patch incompleto")
+                out.write(chunk)
+                written += length
+                pos += length
+            else:
+                raise ValueError("Operação desconhecida no patch")
+    if written != new_size:
+        raise ValueError("Tamanho do arquivo reconstruído não confere")
+
+
+class UpdateCancelled(Exception):
+    """Sinaliza que o download da atualização foi cancelado pelo usuário."""
+
+
 class Updater:
     """
     Gerencia a verificação e atualização do aplicativo.
@@ -93,50 +633,323 @@ class Updater:
     Atributos:
         current_version (str): Versão atual do aplicativo.
         version_url (str): URL para verificação de uma nova versão.
+        timeout (float): Tempo máximo, em segundos, de espera pela resposta.
+        download_timeout (float): Tempo máximo, em segundos, sem receber dados durante o download.
+        channel (str): Canal de atualização ("stable" ou "beta").
+        cache_path (str): Arquivo com o último version.json recebido (None desativa o cache).
     """
 
-    def __init__(self, current_version):
+    def __init__(
+        self,
+        current_version,
+        timeout=UPDATE_CHECK_TIMEOUT,
+        download_timeout=UPDATE_DOWNLOAD_TIMEOUT,
+        channel="stable",
+        cache_path=None,
+    ):
         self.current_version = current_version
         self.version_url = (
             "https://raw.githubusercontent.com/DreamerJP/SuporteApp/main/version.json"
         )
+        self.timeout = timeout
+        self.download_timeout = download_timeout
+        self.channel = channel
+        self.cache_path = cache_path
 
-    def check_for_updates(self):
+    def check_for_updates(self, raise_errors=False):
         """
         Verifica se há uma nova versão consultando a URL definida.
 
+        Parâmetros:
+            raise_errors (bool): Se True, repassa as falhas de consulta em vez de retornar None.
+
         Retorna:
             dict ou None: Informações da nova versão, se disponível.
         """
         try:
-            response = requests.get(self.version_url)
-            response.raise_for_status()
-            version_info = response.json()
-            if version_info["version"] > self.current_version:
-                return version_info
-            return None
+            return self.select_release(self.fetch_manifest())
         except Exception as e:
             print(f"Erro ao verificar atualizações: {e}")
+            if raise_errors:
+                raise
+            return None
+
+    def fetch_manifest(self):
+        """
+        Obtém o version.json usando requisição condicional (ETag/If-Modified-Since).
+        Se o servidor responder 304, o manifesto guardado em cache é reutilizado sem baixar o corpo.
+
+        Retorna:
+            dict: Conteúdo do version.json.
+        """
+        cache = self._load_manifest_cache()
+        headers = {}
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+        response = requests.get(self.version_url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and "manifest" in cache:
+            print("version.json inalterado (304); usando a cópia em cache.")
+            return cache["manifest"]
+        response.raise_for_status()
+        manifest = response.json()
+
+        if self.cache_path and (
+            response.headers.get("ETag") or response.headers.get("Last-Modified")
+        ):
+            try:
+                atomic_write_json(
+                    self.cache_path,
+                    {
+                        "url": self.version_url,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "manifest": manifest,
+                    },
+                    encoding="utf-8",
+                )
+            except OSError as e:
+                print(f"Não foi possível gravar o cache do version.json: {e}")
+        return manifest
+
+    def _load_manifest_cache(self):
+        """Lê o cache do version.json, ignorando-o se for de outra URL ou estiver corrompido."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                cache = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("url") != self.version_url:
+            return {}
+        return cache
+
+    def select_release(self, manifest):
+        """
+        Escolhe a versão mais nova disponível no canal configurado.
+        Os campos principais do version.json formam a versão estável; "channels" pode trazer
+        versões por canal (ex.: {"beta": {"version": ..., "download_url": ...}}).
+        O canal beta também recebe versões estáveis mais novas.
+
+        Parâmetros:
+            manifest (dict): Conteúdo do version.json.
+
+        Retorna:
+            dict ou None: Informações da nova versão, se for mais nova que a atual.
+        """
+        channel = self.channel if self.channel in UPDATE_CHANNELS else "stable"
+        releases = [manifest] if "version" in manifest else []
+        channel_release = (manifest.get("channels") or {}).get(channel)
+        if channel_release and "version" in channel_release:
+            releases.append(channel_release)
+        if not releases:
             return None
 
-    def download_and_install(self, download_url):
+        newest = max(releases, key=lambda release: parse_version(release["version"]))
+        if parse_version(newest["version"]) > parse_version(self.current_version):
+            return newest
+        return None
+
+    def download_path(self, download_url, suffix=".exe"):
+        """
+        Retorna o caminho local do arquivo baixado a partir de uma URL.
+        O nome depende da URL, para que um download interrompido só seja retomado para o mesmo arquivo.
+        """
+        url_hash = hashlib.sha1(download_url.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(
+            tempfile.gettempdir(), f"SuporteApp_update_{url_hash}{suffix}"
+        )
+
+    def download_update(self, version_info, progress=None, cancel_event=None):
         """
-        Faz o download do novo executável, cria e valida o script BAT para substituição e reinicia o aplicativo.
+        Obtém o executável da nova versão, preferindo o patch binário publicado para a versão atual.
+        Se o patch não existir, não puder ser aplicado ou o resultado não conferir, baixa o executável completo.
 
         Parâmetros:
-            download_url (str): URL para download do novo executável.
+            version_info (dict): Dados do version.json.
+            progress (callable): Chamado com (bytes baixados, total ou None) a cada bloco.
+            cancel_event (threading.Event): Interrompe o download quando sinalizado.
+
+        Retorna:
+            str: Caminho do executável pronto para instalação.
+        """
+        expected_sha256 = version_info.get("sha256")
+        patch = (version_info.get("patches") or {}).get(self.current_version)
+        # Sem o checksum da nova versão não há como validar o resultado do patch
+        if patch and expected_sha256 and getattr(sys, "frozen", False):
+            try:
+                return self.apply_patch(
+                    patch,
+                    version_info["download_url"],
+                    expected_sha256,
+                    progress,
+                    cancel_event,
+                )
+            except UpdateCancelled:
+                raise
+            except Exception as e:
+                print(f"Patch não aplicado ({e}); baixando o executável completo.")
+        return self.download(
+            version_info["download_url"], expected_sha256, progress, cancel_event
+        )
+
+    def apply_patch(
+        self, patch, download_url, expected_sha256, progress=None, cancel_event=None
+    ):
+        """
+        Baixa o patch binário e o aplica sobre o executável em uso.
+
+        Parâmetros:
+            patch (dict): Entrada de "patches" no version.json ({"url", "sha256"}).
+            download_url (str): URL do executável completo (define o caminho de destino).
+            expected_sha256 (str): Checksum do executável da nova versão.
+
+        Retorna:
+            str: Caminho do executável reconstruído e verificado.
         """
+        patch_path = self.download(
+            patch["url"], patch.get("sha256"), progress, cancel_event, suffix=".patch"
+        )
+        dest_path = self.download_path(download_url)
+        part_path = dest_path + ".part"
         try:
-            current_exe = sys.executable
-            print(f"[DEBUG] Caminho atual: {current_exe}")
+            apply_delta(sys.executable, patch_path, part_path)
+            if file_sha256(part_path) != expected_sha256.strip().lower():
+                raise ValueError("Checksum do executável reconstruído não confere")
+            os.replace(part_path, dest_path)
+        except BaseException:
+            # O .part reconstruído não serve para retomar o download completo
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        finally:
+            os.remove(patch_path)
+        return dest_path
+
+    def download(
+        self,
+        download_url,
+        expected_sha256=None,
+        progress=None,
+        cancel_event=None,
+        suffix=".exe",
+    ):
+        """
+        Baixa o novo executável em blocos para um arquivo .part, retomando (HTTP Range)
+        um download interrompido, e confere o SHA-256 antes de liberá-lo para instalação.
+        Não usa a interface, podendo rodar em uma thread separada.
 
-            response = requests.get(download_url)
+        Parâmetros:
+            download_url (str): URL para download do novo executável.
+            expected_sha256 (str): Checksum publicado no version.json (não verifica se None).
+            progress (callable): Chamado com (bytes baixados, total ou None) a cada bloco.
+            cancel_event (threading.Event): Interrompe o download quando sinalizado.
+            suffix (str): Extensão do arquivo baixado.
+
+        Retorna:
+            str: Caminho do arquivo baixado e verificado.
+        """
+        dest_path = self.download_path(download_url, suffix)
+        part_path = dest_path + ".part"
+
+        attempts = 0
+        while True:
+            try:
+                self._download_part(download_url, part_path, progress, cancel_event)
+                break
+            except (
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            ) as e:
+                attempts += 1
+                if attempts > UPDATE_DOWNLOAD_RETRIES:
+                    raise
+                print(
+                    f"Download interrompido ({e}); retomando ({attempts}/{UPDATE_DOWNLOAD_RETRIES})..."
+                )
+
+        if expected_sha256:
+            digest = file_sha256(part_path)
+            if digest.lower() != expected_sha256.strip().lower():
+                os.remove(part_path)
+                raise ValueError(
+                    f"Checksum SHA-256 do download não confere (esperado {expected_sha256}, obtido {digest})"
+                )
+        else:
+            print(
+                "Aviso: version.json não publica sha256; download instalado sem verificação."
+            )
+
+        os.replace(part_path, dest_path)
+        return dest_path
+
+    def _download_part(self, download_url, part_path, progress, cancel_event):
+        """
+        Grava (ou completa) o arquivo .part a partir da resposta do servidor.
+        Uma resposta 206 continua do ponto em que parou; uma resposta 200 recomeça do zero.
+        """
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        with requests.get(
+            download_url, headers=headers, stream=True, timeout=self.download_timeout
+        ) as response:
+            if response.status_code == 416:
+                # Nada depois do offset: o arquivo parcial já está completo ou é maior que o atual
+                total = response.headers.get("Content-Range", "").rpartition("/")[2]
+                if total.isdigit() and int(total) == offset:
+                    return
+                os.remove(part_path)
+                raise requests.ConnectionError(
+                    "Arquivo parcial inválido; reiniciando download"
+                )
             response.raise_for_status()
 
-            with tempfile.NamedTemporaryFile(suffix=".exe", delete=False) as temp_file:
-                temp_file.write(response.content)
-                new_exe_path = temp_file.name
-                print(f"[DEBUG] Novo executável: {new_exe_path}")
+            content_range = response.headers.get("Content-Range", "")
+            if (
+                offset
+                and response.status_code == 206
+                and content_range.startswith(f"bytes {offset}-")
+            ):
+                mode = "ab"
+            else:
+                # O servidor ignorou o Range: recomeça do início
+                mode, offset = "wb", 0
+
+            length = response.headers.get("Content-Length")
+            total = offset + int(length) if length and length.isdigit() else None
+
+            with open(part_path, mode) as file:
+                for chunk in response.iter_content(chunk_size=UPDATE_CHUNK_SIZE):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise UpdateCancelled("Download cancelado pelo usuário")
+                    file.write(chunk)
+                    offset += len(chunk)
+                    if progress:
+                        progress(offset, total)
+
+            if total is not None and offset < total:
+                raise requests.ConnectionError(
+                    f"Download incompleto ({offset} de {total} bytes)"
+                )
+
+    def install(self, new_exe_path):
+        """
+        Cria e valida o script BAT de substituição para o executável já baixado e reinicia o aplicativo.
+
+        Parâmetros:
+            new_exe_path (str): Caminho do novo executável baixado e verificado.
+        """
+        import subprocess
+
+        try:
+            current_exe = sys.executable
+            print(f"[DEBUG] Caminho atual: {current_exe}")
+            print(f"[DEBUG] Novo executável: {new_exe_path}")
 
             bat_content = self.generate_bat_script(current_exe, new_exe_path)
             bat_path = self.write_and_validate_bat(
@@ -259,10 +1072,16 @@ class ConfigManager:
     Gerencia o carregamento e salvamento das configurações do aplicativo.
 
     As configurações incluem caminhos de arquivos, temas e tamanhos de janelas.
+    Alterações frequentes são agrupadas: schedule_save marca a configuração como
+    pendente e a gravação acontece no máximo uma vez por CONFIG_SAVE_INTERVAL_MS.
     """
 
-    def __init__(self):
-        self.config_path = os.path.join(os.path.dirname(sys.executable), CONFIG_FILE)
+    def __init__(self, root=None, base_dir=None):
+        self.root = root
+        self.dirty = False
+        self.flush_job = None
+        base_dir = base_dir or os.path.dirname(sys.executable)
+        self.config_path = os.path.join(base_dir, CONFIG_FILE)
         self.default_config = {
             "bg_image_path": DEFAULT_BG_IMAGE_PATH,
             "sound_enabled": True,
@@ -273,6 +1092,16 @@ class ConfigManager:
             "notepad_expanded": True,
             "last_bg_image_path": DEFAULT_BG_IMAGE_PATH,
             "last_bg_color": DEFAULT_BG_COLOR,
+            "offline_mode": False,
+            "update_check_timeout": UPDATE_CHECK_TIMEOUT,
+            "update_check_interval_hours": UPDATE_CHECK_INTERVAL_HOURS,
+            "last_update_check": 0,
+            "update_channel": "stable",  # Um dos UPDATE_CHANNELS
+            "texts_storage": "json",  # "json" ou "sqlite"
+            "audio_backend": "auto",  # "auto" ou um dos nomes de AUDIO_PLAYERS
+            "notepad_undo_steps": NOTEPAD_UNDO_STEPS,
+            "notepad_undo_max_kb": NOTEPAD_UNDO_MAX_KB,
+            "notepad_autosave_seconds": NOTEPAD_AUTOSAVE_SECONDS,
         }
         self.config = self.load_config()
 
@@ -296,86 +1125,732 @@ class ConfigManager:
         return self.default_config
 
     def save_config(self):
-        """Salva as configurações atuais no arquivo de configuração."""
-        with open(self.config_path, "w") as file:
-            json.dump(self.config, file)
+        """Salva imediatamente as configurações atuais no arquivo de configuração (gravação atômica)."""
+        atomic_write_json(self.config_path, self.config)
+        self.dirty = False
 
+    def schedule_save(self):
+        """
+        Marca a configuração como alterada e agenda uma gravação.
 
-class TextManager:
+        Várias chamadas dentro do mesmo intervalo resultam em uma única escrita no disco.
+        Sem um root do Tk para agendar, grava imediatamente.
+        """
+        self.dirty = True
+        if self.root is None:
+            self.flush()
+            return
+        if self.flush_job is None:
+            self.flush_job = self.root.after(CONFIG_SAVE_INTERVAL_MS, self.flush)
+
+    def flush(self):
+        """Grava a configuração se houver alterações pendentes e cancela o agendamento."""
+        if self.flush_job is not None:
+            try:
+                self.root.after_cancel(self.flush_job)
+            except tk.TclError:
+                pass
+            self.flush_job = None
+        if self.dirty:
+            try:
+                self.save_config()
+            except OSError as e:
+                print(f"Erro ao salvar configurações: {e}")
+
+
+def normalize_search_text(text):
+    """Converte o texto para minúsculas e remove acentos ("Início" -> "inicio")."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize_search_text(text):
+    """Divide o texto normalizado em palavras."""
+    return re.findall(r"\w+", normalize_search_text(text))
+
+
+class SearchIndex:
     """
-    Gerencia o carregamento e salvamento dos textos que serão copiados pelos botões.
+    Índice de busca em memória sobre os textos (rótulo, corpo e categoria).
+
+    Mantém um índice invertido (palavra -> IDs dos textos, com peso por campo) e um
+    índice de trigramas do vocabulário, usado para encontrar palavras por prefixo
+    ("conex" -> "conexao") e por semelhança, tolerando erros de digitação ("conexao" ~ "conecao").
+    A busca não diferencia acentos nem maiúsculas. O índice é atualizado
+    incrementalmente a cada inclusão, edição ou exclusão de texto.
     """
 
+    # Peso de uma palavra de acordo com o campo onde aparece
+    LABEL_WEIGHT = 3.0
+    CATEGORY_WEIGHT = 2.0
+    TEXT_WEIGHT = 1.0
+    # Similaridade mínima (Jaccard de trigramas) para aceitar uma palavra aproximada
+    FUZZY_THRESHOLD = 0.45
+    # Palavras da consulta mais curtas que isso são ignoradas (casariam com quase tudo)
+    MIN_QUERY_TOKEN = 2
+
     def __init__(self):
-        self.texts_path = os.path.join(os.path.dirname(sys.executable), TEXTS_FILE)
-        self.texts = self.load_texts()
-        # Dicionário para armazenar as categorias
-        self.categories = self.extract_categories()
+        self.postings = {}  # palavra -> {id: peso}
+        self.doc_tokens = {}  # id -> conjunto de palavras do texto
+        self.trigrams = {}  # trigrama -> conjunto de palavras do vocabulário
+        self.short_prefixes = {}  # prefixo de 2 letras -> conjunto de palavras
+
+    @staticmethod
+    def _trigrams(token, anchor_end=True):
+        padded = f"  {token} " if anchor_end else f"  {token}"
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, doc_id, text, label, category):
+        """Indexa (ou reindexa) um texto."""
+        if doc_id in self.doc_tokens:
+            self.remove(doc_id)
+        weights = {}
+        fields = (
+            (label, self.LABEL_WEIGHT),
+            (category, self.CATEGORY_WEIGHT),
+            (text, self.TEXT_WEIGHT),
+        )
+        for value, weight in fields:
+            for token in tokenize_search_text(value):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+        for token, weight in weights.items():
+            docs = self.postings.get(token)
+            if docs is None:
+                docs = self.postings[token] = {}
+                self._add_to_vocabulary(token)
+            docs[doc_id] = weight
+        self.doc_tokens[doc_id] = set(weights)
+
+    def remove(self, doc_id):
+        """Remove um texto do índice."""
+        for token in self.doc_tokens.pop(doc_id, ()):
+            docs = self.postings[token]
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[token]
+                self._remove_from_vocabulary(token)
+
+    def _add_to_vocabulary(self, token):
+        for trigram in self._trigrams(token):
+            self.trigrams.setdefault(trigram, set()).add(token)
+        if len(token) >= 2:
+            self.short_prefixes.setdefault(token[:2], set()).add(token)
+
+    def _remove_from_vocabulary(self, token):
+        for trigram in self._trigrams(token):
+            tokens = self.trigrams.get(trigram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self.trigrams[trigram]
+        tokens = self.short_prefixes.get(token[:2])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self.short_prefixes[token[:2]]
+
+    def _match_tokens(self, query_token):
+        """Retorna {palavra do vocabulário: relevância} para uma palavra da consulta."""
+        matches = {}
+        if query_token in self.postings:
+            matches[query_token] = 1.0
+
+        # Prefixo: palavras que começam com o termo digitado
+        if len(query_token) <= 2:
+            candidates = self.short_prefixes.get(query_token, ())
+        else:
+            sets = [
+                self.trigrams.get(t, ())
+                for t in self._trigrams(query_token, anchor_end=False)
+            ]
+            candidates = min(sets, key=len)
+        for token in candidates:
+            if token != query_token and token.startswith(query_token):
+                matches[token] = 0.8
+
+        # Semelhança: tolera erros de digitação em palavras maiores
+        if len(query_token) >= 4:
+            query_trigrams = self._trigrams(query_token)
+            overlap = {}
+            for trigram in query_trigrams:
+                for token in self.trigrams.get(trigram, ()):
+                    overlap[token] = overlap.get(token, 0) + 1
+            for token, shared in overlap.items():
+                if token in matches:
+                    continue
+                similarity = shared / (len(query_trigrams) + len(token) + 1 - shared)
+                if similarity >= self.FUZZY_THRESHOLD:
+                    matches[token] = 0.6 * similarity
+        return matches
+
+    @classmethod
+    def query_tokens(cls, query):
+        """Retorna as palavras da consulta usadas na busca (ignorando as muito curtas)."""
+        return {
+            token
+            for token in tokenize_search_text(query)
+            if len(token) >= cls.MIN_QUERY_TOKEN
+        }
 
-    def load_texts(self):
+    def search(self, query):
         """
-        Carrega os textos do arquivo ou retorna uma lista padrão.
+        Busca os textos que contêm todas as palavras da consulta (exatas, por prefixo ou aproximadas).
 
         Retorna:
-            list: Lista de tuplas (texto, rótulo do botão, categoria).
+            dict: {id: pontuação}, onde uma pontuação maior indica maior relevância.
         """
-        if os.path.exists(self.texts_path):
-            try:
-                with open(self.texts_path, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    # Se for uma lista simples de tuplas [texto, rótulo]
-                    if isinstance(data, list) and len(data) > 0:
-                        # Verifica o formato dos dados
-                        if isinstance(data[0], list):
-                            # Se já tiver 3 elementos, mantém como está
-                            if len(data[0]) == 3:
-                                return data
-                            # Se tiver 2 elementos, adiciona a categoria "Geral"
-                            elif len(data[0]) == 2:
-                                return [(text, label, "Geral") for text, label in data]
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
-        return [("EXEMPLO", "BOTÃO", "Geral")]
-
-    def save_texts(self):
-        """Salva os textos atuais no arquivo de configuração, mantendo a formatação UTF-8."""
-        with open(self.texts_path, "w", encoding="utf-8") as file:
-            json.dump(self.texts, file, ensure_ascii=False, indent=4)
-
-    def extract_categories(self):
-        """Extrai as categorias únicas dos textos carregados."""
-        categories = set()
-        for item in self.texts:
-            # Se o item tiver categoria, usa ela; senão, usa 'Geral'
-            if len(item) >= 3:
-                categories.add(item[2])
+        scores = None
+        for query_token in self.query_tokens(query):
+            token_scores = {}
+            for token, relevance in self._match_tokens(query_token).items():
+                for doc_id, weight in self.postings[token].items():
+                    score = weight * relevance
+                    if token_scores.get(doc_id, 0) < score:
+                        token_scores[doc_id] = score
+            if scores is None:
+                scores = token_scores
             else:
-                categories.add("Geral")
+                scores = {
+                    doc_id: score + token_scores[doc_id]
+                    for doc_id, score in scores.items()
+                    if doc_id in token_scores
+                }
+            if not scores:
+                return {}
+        return scores or {}
 
-        # Garante que 'Geral' sempre exista
-        categories.add("Geral")
-        return sorted(list(categories))
 
-    def add_category(self, category_name):
-        """Adiciona uma nova categoria se ela não existir."""
-        if category_name and category_name not in self.categories:
-            self.categories.append(category_name)
-            self.categories.sort()
-            return True
-        return False
+class SqliteTextStore:
+    """
+    Armazenamento dos textos em um banco SQLite (modo WAL).
 
-    def rename_category(self, old_name, new_name):
-        """Renomeia uma categoria e atualiza todos os textos associados."""
-        if old_name in self.categories and new_name and new_name not in self.categories:
-            # Atualiza todos os textos com a categoria antiga
-            for i, item in enumerate(self.texts):
-                if len(item) >= 3 and item[2] == old_name:
-                    self.texts[i] = (item[0], item[1], new_name)
+    Cada alteração grava apenas a linha afetada, em uma transação própria, em vez de
+    reescrever o arquivo inteiro. A ordem dos textos é mantida por uma coluna "position"
+    fracionária: mover um texto altera só a posição dele (a média entre os vizinhos).
 
-            # Atualiza a lista de categorias
-            self.categories.remove(old_name)
-            self.categories.append(new_name)
-            self.categories.sort()
+    Com read_only=True o banco é aberto somente para leitura (mode=ro), sem criar tabelas
+    nem alterar o modo do diário.
+    """
+
+    def __init__(self, db_path, read_only=False):
+        import pathlib
+
+        self.db_path = db_path
+        self.sort_keys = {}  # id -> valor da coluna position
+        # Maior posição já usada (novos textos vão depois dela)
+        self.max_position = -1.0
+        if read_only:
+            # O acesso é serializado por quem usa o banco (ex.: SnippetService.lock), então a
+            # conexão pode ser fechada por outra thread do servidor
+            self.conn = sqlite3.connect(
+                pathlib.Path(db_path).absolute().as_uri() + "?mode=ro",
+                uri=True,
+                check_same_thread=False,
+            )
+            return
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS texts (
+                    id INTEGER PRIMARY KEY,
+                    position REAL NOT NULL,
+                    text TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    category TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_texts_position ON texts(position);
+                CREATE INDEX IF NOT EXISTS idx_texts_category ON texts(category);
+                CREATE INDEX IF NOT EXISTS idx_texts_label ON texts(label);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                """)
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        self.conn.close()
+
+    def is_initialized(self):
+        """Indica se o banco já recebeu a importação inicial dos textos."""
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'initialized'"
+        ).fetchone()
+        return row is not None
+
+    def import_texts(self, texts):
+        """Importa a lista de textos (ex.: do texts.json) em uma única transação."""
+        with self.conn:
+            self.conn.execute("DELETE FROM texts")
+            self.conn.executemany(
+                "INSERT INTO texts (position, text, label, category) VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        float(pos),
+                        item[0],
+                        item[1],
+                        item[2] if len(item) >= 3 else "Geral",
+                    )
+                    for pos, item in enumerate(texts)
+                ],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('initialized', ?)",
+                (time.strftime("%Y-%m-%d %H:%M:%S"),),
+            )
+
+    def load(self):
+        """
+        Carrega os textos em ordem.
+
+        Retorna:
+            list: Tuplas (id, texto, rótulo, categoria).
+        """
+        rows = self.conn.execute(
+            "SELECT id, position, text, label, category FROM texts ORDER BY position, id"
+        ).fetchall()
+        self.sort_keys = {row[0]: row[1] for row in rows}
+        self.max_position = rows[-1][1] if rows else -1.0
+        return [(row[0], row[2], row[3], row[4]) for row in rows]
+
+    def insert(self, text, label, category):
+        """Insere um texto no final da lista e retorna o seu ID."""
+        position = self.max_position + 1
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO texts (position, text, label, category) VALUES (?, ?, ?, ?)",
+                (position, text, label, category),
+            )
+        self.sort_keys[cursor.lastrowid] = position
+        self.max_position = position
+        return cursor.lastrowid
+
+    def update(self, text_id, text, label, category):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE texts SET text = ?, label = ?, category = ? WHERE id = ?",
+                (text, label, category, text_id),
+            )
+
+    def delete(self, text_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM texts WHERE id = ?", (text_id,))
+        self.sort_keys.pop(text_id, None)
+
+    def move(self, text_id, ids, new_pos):
+        """
+        Grava a nova posição de um texto que já foi movido para ids[new_pos].
+
+        Parâmetros:
+            ids (list): IDs de todos os textos, já na nova ordem.
+        """
+        before = self.sort_keys[ids[new_pos - 1]] if new_pos > 0 else None
+        after = self.sort_keys[ids[new_pos + 1]] if new_pos + 1 < len(ids) else None
+        if before is None:
+            position = (after if after is not None else 0.0) - 1
+        elif after is None:
+            position = before + 1
+        else:
+            position = (before + after) / 2
+        if position in (before, after):
+            # Sem precisão para intercalar: renumera tudo (raro)
+            self.renumber(ids)
+            return
+        with self.conn:
+            self.conn.execute(
+                "UPDATE texts SET position = ? WHERE id = ?", (position, text_id)
+            )
+        self.sort_keys[text_id] = position
+        self.max_position = max(self.max_position, position)
+
+    def renumber(self, ids):
+        """Regrava as posições de todos os textos como 0, 1, 2, ... na ordem informada."""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE texts SET position = ? WHERE id = ?",
+                [(float(pos), text_id) for pos, text_id in enumerate(ids)],
+            )
+        self.sort_keys = {text_id: float(pos) for pos, text_id in enumerate(ids)}
+        self.max_position = float(len(ids) - 1)
+
+    def rename_category(self, old_name, new_name):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE texts SET category = ? WHERE category = ?", (new_name, old_name)
+            )
+
+
+class TextManager:
+    """
+    Gerencia o carregamento e salvamento dos textos que serão copiados pelos botões.
+
+    Cada texto recebe um ID estável durante a execução (self.ids é paralela a self.texts),
+    e self.positions mapeia ID -> posição na lista, permitindo localizar, editar e mover
+    um texto sem buscas lineares, mesmo quando existem textos idênticos.
+
+    self.category_ids mapeia cada categoria aos IDs dos seus textos, de forma que filtrar,
+    contar, renomear ou excluir uma categoria custa tempo proporcional ao tamanho dela.
+
+    Com storage="sqlite" os textos ficam em texts.db (ver SqliteTextStore) e cada alteração
+    grava só a linha afetada; na primeira execução o texts.json existente é importado.
+    Ao voltar para storage="json", os textos do texts.db são exportados para o texts.json.
+
+    Com read_only=True (linha de comando e API local) nada é gravado: o texts.db é aberto
+    somente para leitura e, se ainda não existir, os textos vêm do texts.json.
+    """
+
+    def __init__(self, storage="json", base_dir=None, read_only=False):
+        base_dir = base_dir or os.path.dirname(sys.executable)
+        self.texts_path = os.path.join(base_dir, TEXTS_FILE)
+        self.id_counter = itertools.count(1)
+        self.store = None
+        db_path = os.path.join(base_dir, TEXTS_DB_FILE)
+        if storage == "sqlite":
+            rows = self._open_store(db_path, read_only)
+            if rows is not None:
+                self.texts = [
+                    (text, label, category) for _, text, label, category in rows
+                ]
+                self.ids = [row[0] for row in rows]
+        elif not read_only:
+            self._export_store(db_path)
+        if self.store is None:
+            self.texts = self.load_texts()
+            self.ids = [next(self.id_counter) for _ in self.texts]
+        self.positions = {}
+        self._reindex()
+        # Índice de busca, construído em etapas por index_pending_texts (ou, se ninguém
+        # iniciou a construção, na primeira consulta)
+        self.search_index = None
+        # IDs ainda não indexados, do último para o primeiro
+        self.index_pending = []
+        # Índice de categorias: categoria -> {id: None} (um conjunto ordenado de IDs)
+        self.category_ids = {"Geral": {}}
+        for text_id, item in zip(self.ids, self.texts):
+            self.category_ids.setdefault(self._category_of(item), {})[text_id] = None
+        # Lista ordenada com os nomes das categorias
+        self.categories = self.extract_categories()
+
+    def _open_store(self, db_path, read_only):
+        """
+        Abre o banco de textos, importando o texts.json na primeira vez (exceto em read_only).
+        Fora do read_only, o texts.json também é reimportado se foi alterado depois do banco
+        (edições feitas com o armazenamento em "json").
+
+        Retorna:
+            list | None: Linhas (id, texto, rótulo, categoria), ou None para usar o texts.json.
+        """
+        if read_only and not os.path.exists(db_path):
+            return None
+        db_time = self._modified_time(db_path, db_path + "-wal")
+        json_time = self._modified_time(self.texts_path)
+        json_newer = (
+            db_time is not None and json_time is not None and json_time > db_time
+        )
+        try:
+            self.store = SqliteTextStore(db_path, read_only=read_only)
+            if not self.store.is_initialized() or (json_newer and not read_only):
+                if read_only:
+                    self.close()
+                    return None
+                self.store.import_texts(self.load_texts())
+            return self.store.load()
+        except Exception as e:
+            print(f"Erro ao abrir o banco de textos, usando {TEXTS_FILE}: {e}")
+            self.close()
+            return None
+
+    def _export_store(self, db_path):
+        """
+        Exporta para o texts.json os textos de um texts.db alterado depois da última
+        sincronização (o armazenamento voltou de "sqlite" para "json"), para não perder as
+        edições feitas nele. O banco só é aberto, em modo somente leitura, quando é mais
+        recente que o texts.json; nas demais inicializações nem o sqlite3 é importado.
+        """
+        db_time = self._modified_time(db_path, db_path + "-wal")
+        if db_time is None:
+            return
+        json_time = self._modified_time(self.texts_path)
+        if json_time is not None and json_time >= db_time:
+            return
+        try:
+            store = SqliteTextStore(db_path, read_only=True)
+            try:
+                rows = store.load() if store.is_initialized() else None
+            finally:
+                store.close()
+            # Grava depois de fechar o banco, para o texts.json ficar mais recente que ele
+            if rows is not None:
+                atomic_write_json(
+                    self.texts_path,
+                    [[text, label, category] for _, text, label, category in rows],
+                    encoding="utf-8",
+                    ensure_ascii=False,
+                    indent=4,
+                )
+                print(f"Textos do {TEXTS_DB_FILE} exportados para {TEXTS_FILE}.")
+        except Exception as e:
+            print(f"Erro ao exportar {TEXTS_DB_FILE} para {TEXTS_FILE}: {e}")
+
+    @staticmethod
+    def _modified_time(path, wal_path=None):
+        """
+        Retorna o horário de modificação (em ns) do arquivo, ou None se ele não existir.
+        Com wal_path, considera também o WAL do SQLite quando ele tem conteúdo (uma leitura
+        somente leitura deixa um WAL vazio para trás, que não indica alteração).
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        if wal_path is not None:
+            try:
+                wal = os.stat(wal_path)
+                if wal.st_size > 0:
+                    mtime = max(mtime, wal.st_mtime_ns)
+            except OSError:
+                pass
+        return mtime
+
+    def close(self):
+        """Fecha o banco de textos, se estiver em uso."""
+        if self.store is not None:
+            try:
+                self.store.close()
+            except Exception as e:
+                print(f"Erro ao fechar o banco de textos: {e}")
+            self.store = None
+
+    def load_texts(self):
+        """
+        Carrega os textos do arquivo ou retorna uma lista padrão.
+
+        Retorna:
+            list: Lista de tuplas (texto, rótulo do botão, categoria).
+        """
+        if os.path.exists(self.texts_path):
+            try:
+                with open(self.texts_path, "r", encoding="utf-8") as file:
+                    data = json.load(file)
+                    # Se for uma lista simples de tuplas [texto, rótulo]
+                    if isinstance(data, list) and len(data) > 0:
+                        # Verifica o formato dos dados
+                        if isinstance(data[0], list):
+                            # Se já tiver 3 elementos, mantém como está
+                            if len(data[0]) == 3:
+                                return data
+                            # Se tiver 2 elementos, adiciona a categoria "Geral"
+                            elif len(data[0]) == 2:
+                                return [(text, label, "Geral") for text, label in data]
+            except (json.JSONDecodeError, FileNotFoundError):
+                pass
+        return [("EXEMPLO", "BOTÃO", "Geral")]
+
+    @perf_monitor.timed("TextManager.save_texts")
+    def save_texts(self):
+        """
+        Salva os textos atuais no arquivo de configuração, mantendo a formatação UTF-8.
+
+        No modo SQLite cada alteração já foi gravada individualmente, então não há nada a fazer.
+        """
+        if self.store is not None:
+            return
+        atomic_write_json(
+            self.texts_path, self.texts, encoding="utf-8", ensure_ascii=False, indent=4
+        )
+
+    @staticmethod
+    def _category_of(item):
+        """Categoria de um item, considerando 'Geral' para o formato antigo (texto, rótulo)."""
+        return item[2] if len(item) >= 3 else "Geral"
+
+    def _index_category(self, text_id, category):
+        """Registra o texto no índice de categorias, criando a categoria se necessário."""
+        if category not in self.category_ids:
+            self.category_ids[category] = {}
+            bisect.insort(self.categories, category)
+        self.category_ids[category][text_id] = None
+
+    def ids_in_category(self, category):
+        """Retorna os IDs dos textos de uma categoria, na ordem da lista de textos."""
+        return sorted(
+            self.category_ids.get(category, ()), key=self.positions.__getitem__
+        )
+
+    def category_count(self, category):
+        """Retorna quantos textos pertencem à categoria."""
+        return len(self.category_ids.get(category, ()))
+
+    def _reindex(self, start=0, end=None):
+        """Atualiza o mapa ID -> posição para as posições no intervalo [start, end)."""
+        end = len(self.ids) if end is None else end
+        for pos in range(start, end):
+            self.positions[self.ids[pos]] = pos
+
+    def index_of(self, text_id):
+        """Retorna a posição atual do texto com o ID informado."""
+        return self.positions[text_id]
+
+    def get_text(self, text_id):
+        """
+        Retorna o texto com o ID informado, sempre no formato (texto, rótulo, categoria).
+
+        Levanta KeyError se o texto não existir mais.
+        """
+        item = self.texts[self.positions[text_id]]
+        if len(item) == 2:
+            return (item[0], item[1], "Geral")
+        return tuple(item)
+
+    def add_text(self, text, label, category):
+        """Adiciona um texto ao final da lista, salva e retorna o seu ID."""
+        if self.store is not None:
+            text_id = self.store.insert(text, label, category)
+        else:
+            text_id = next(self.id_counter)
+        self.texts.append((text, label, category))
+        self.ids.append(text_id)
+        self.positions[text_id] = len(self.ids) - 1
+        self._index_category(text_id, category)
+        if self.search_index is not None:
+            self.search_index.add(text_id, text, label, category)
+        self.save_texts()
+        return text_id
+
+    def update_text(self, text_id, text, label, category):
+        """Substitui o conteúdo de um texto existente e salva."""
+        pos = self.positions[text_id]
+        old_category = self._category_of(self.texts[pos])
+        if old_category != category:
+            self.category_ids[old_category].pop(text_id, None)
+            self._index_category(text_id, category)
+        self.texts[pos] = (text, label, category)
+        if self.search_index is not None:
+            self.search_index.add(text_id, text, label, category)
+        if self.store is not None:
+            self.store.update(text_id, text, label, category)
+        self.save_texts()
+
+    def delete_text(self, text_id):
+        """Remove um texto e salva. Apenas as posições seguintes são reindexadas."""
+        pos = self.positions.pop(text_id)
+        self.category_ids[self._category_of(self.texts[pos])].pop(text_id, None)
+        del self.texts[pos]
+        del self.ids[pos]
+        self._reindex(pos)
+        if self.search_index is not None:
+            self.search_index.remove(text_id)
+        if self.store is not None:
+            self.store.delete(text_id)
+        self.save_texts()
+
+    def search(self, query):
+        """
+        Busca textos pelo rótulo, conteúdo ou categoria (sem diferenciar acentos).
+        Palavras de uma letra são ignoradas; enquanto o índice está em construção, a lista
+        é filtrada diretamente (_linear_search).
+
+        Retorna:
+            list: IDs encontrados, do mais relevante para o menos relevante
+            (empates mantêm a ordem da lista de textos).
+        """
+        query_tokens = SearchIndex.query_tokens(query)
+        if not query_tokens:
+            # Só palavras muito curtas: nenhum filtro
+            return list(self.ids)
+        if self.search_index is None:
+            self.start_search_index()
+            self.index_pending_texts(None)
+        elif self.index_pending:
+            return self._linear_search(query_tokens)
+        scores = self.search_index.search(query)
+        return sorted(scores, key=lambda i: (-scores[i], self.positions[i]))
+
+    def _linear_search(self, query_tokens):
+        """
+        Filtra os textos percorrendo a lista, enquanto o índice de busca ainda está sendo
+        construído. Aceita os textos que contêm todas as palavras, sem relevância nem
+        tolerância a erros de digitação.
+        """
+        found = []
+        for text_id, (text, label, category) in zip(self.ids, self.texts):
+            content = normalize_search_text(f"{label} {category} {text}")
+            if all(token in content for token in query_tokens):
+                found.append(text_id)
+        return found
+
+    def start_search_index(self):
+        """Cria o índice de busca vazio e marca todos os textos como pendentes de indexação."""
+        self.search_index = SearchIndex()
+        self.index_pending = self.ids[::-1]
+
+    def index_pending_texts(self, limit=SEARCH_INDEX_BATCH):
+        """
+        Indexa até limit textos pendentes (None = todos). Textos incluídos ou editados
+        durante a construção já entram no índice diretamente.
+
+        Retorna:
+            bool: True se o índice está completo.
+        """
+        while self.index_pending and limit != 0:
+            text_id = self.index_pending.pop()
+            if text_id in self.positions:
+                self.search_index.add(text_id, *self.get_text(text_id))
+            if limit is not None:
+                limit -= 1
+        return not self.index_pending
+
+    def move_text(self, text_id, new_pos):
+        """
+        Move um texto para new_pos (posição contada antes da remoção, como em list.insert) e salva.
+
+        Apenas as posições entre a origem e o destino são reindexadas.
+        """
+        old_pos = self.positions[text_id]
+        if new_pos == old_pos:
+            return
+        item = self.texts.pop(old_pos)
+        self.ids.pop(old_pos)
+        self.texts.insert(new_pos, item)
+        self.ids.insert(new_pos, text_id)
+        self._reindex(min(old_pos, new_pos), max(old_pos, new_pos) + 1)
+        if self.store is not None:
+            self.store.move(text_id, self.ids, new_pos)
+        self.save_texts()
+
+    def extract_categories(self):
+        """Extrai as categorias únicas dos textos carregados (a partir do índice de categorias)."""
+        # 'Geral' sempre existe, pois o índice é criado com ela
+        return sorted(self.category_ids)
+
+    def add_category(self, category_name):
+        """Adiciona uma nova categoria se ela não existir."""
+        if category_name and category_name not in self.category_ids:
+            self.category_ids[category_name] = {}
+            bisect.insort(self.categories, category_name)
+            return True
+        return False
+
+    def rename_category(self, old_name, new_name):
+        """Renomeia uma categoria e atualiza todos os textos associados."""
+        if old_name in self.categories and new_name and new_name not in self.categories:
+            # Atualiza apenas os textos da categoria antiga (via índice)
+            text_ids = self.category_ids.pop(old_name)
+            for text_id in text_ids:
+                pos = self.positions[text_id]
+                item = self.texts[pos]
+                self.texts[pos] = (item[0], item[1], new_name)
+                if self.search_index is not None:
+                    self.search_index.add(text_id, *self.texts[pos])
+            self.category_ids[new_name] = text_ids
+
+            if self.store is not None:
+                self.store.rename_category(old_name, new_name)
+
+            # Atualiza a lista de categorias
+            self.categories.remove(old_name)
+            self.categories.append(new_name)
+            self.categories.sort()
             self.save_texts()
             return True
         return False
@@ -383,10 +1858,18 @@ class TextManager:
     def delete_category(self, category_name):
         """Deleta uma categoria e move seus textos para 'Geral'."""
         if category_name in self.categories and category_name != "Geral":
-            # Move todos os textos para a categoria 'Geral'
-            for i, item in enumerate(self.texts):
-                if len(item) >= 3 and item[2] == category_name:
-                    self.texts[i] = (item[0], item[1], "Geral")
+            # Move os textos da categoria (via índice) para 'Geral'
+            general_ids = self.category_ids["Geral"]
+            for text_id in self.category_ids.pop(category_name):
+                pos = self.positions[text_id]
+                item = self.texts[pos]
+                self.texts[pos] = (item[0], item[1], "Geral")
+                general_ids[text_id] = None
+                if self.search_index is not None:
+                    self.search_index.add(text_id, *self.texts[pos])
+
+            if self.store is not None:
+                self.store.rename_category(category_name, "Geral")
 
             # Remove a categoria
             self.categories.remove(category_name)
@@ -395,41 +1878,714 @@ class TextManager:
         return False
 
 
+def _common_prefix_length(a, b):
+    """
+    Calcula o tamanho do prefixo comum entre duas strings.
+    Compara fatias por busca binária, de modo que o trabalho pesado fica na comparação nativa de strings.
+    """
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix_length(a, b, limit):
+    """Calcula o tamanho do sufixo comum entre duas strings, sem ultrapassar limit caracteres."""
+    len_a, len_b = len(a), len(b)
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len_a - mid : len_a - low] == b[len_b - mid : len_b - low]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def text_diff(old, new):
+    """
+    Calcula a diferença entre dois textos como uma única substituição.
+
+    Parâmetros:
+        old (str): Texto original.
+        new (str): Texto alterado.
+
+    Retorna:
+        tuple: (início, trecho removido de old, trecho inserido em new).
+    """
+    prefix = _common_prefix_length(old, new)
+    suffix = _common_suffix_length(old, new, min(len(old), len(new)) - prefix)
+    return prefix, old[prefix : len(old) - suffix], new[prefix : len(new) - suffix]
+
+
+def apply_text_diff(text, start, removed, inserted):
+    """Aplica ao texto a substituição de removed por inserted a partir da posição start."""
+    return text[:start] + inserted + text[start + len(removed) :]
+
+
+class UndoHistory:
+    """
+    Histórico de desfazer/refazer do bloco de notas.
+    Guarda apenas a diferença entre estados consecutivos (e as tags só quando mudam),
+    limitado por número de passos e por memória.
+    """
+
+    # Estimativa de bytes ocupados por cada tag guardada no histórico
+    TAG_COST = 64
+
+    def __init__(
+        self, max_steps=NOTEPAD_UNDO_STEPS, max_bytes=NOTEPAD_UNDO_MAX_KB * 1024
+    ):
+        self.max_steps = max(1, int(max_steps))
+        self.max_bytes = max(1, int(max_bytes))
+        self.text = ""
+        self.tags = []
+        self.undo_entries = []
+        self.redo_entries = []
+        self.total_bytes = 0
+
+    def reset(self, text, tags):
+        """Define o estado base (ex.: conteúdo recém-carregado) e descarta o histórico."""
+        self.text = text
+        self.tags = list(tags)
+        self.undo_entries = []
+        self.redo_entries = []
+        self.total_bytes = 0
+
+    def _entry_size(self, entry):
+        """Estima a memória ocupada por uma entrada do histórico."""
+        size = len(entry["removed"]) + len(entry["inserted"])
+        for key in ("tags_before", "tags_after"):
+            if entry[key] is not None:
+                size += len(entry[key]) * self.TAG_COST
+        return size
+
+    def record(self, text, tags):
+        """
+        Registra um novo estado do bloco de notas.
+
+        Retorna:
+            bool: True se houve alteração em relação ao último estado registrado.
+        """
+        tags_changed = tags != self.tags
+        if not tags_changed and text == self.text:
+            return False
+
+        start, removed, inserted = text_diff(self.text, text)
+        entry = {
+            "start": start,
+            "removed": removed,
+            "inserted": inserted,
+            "tags_before": self.tags if tags_changed else None,
+            "tags_after": list(tags) if tags_changed else None,
+        }
+
+        # Um novo estado invalida o que podia ser refeito
+        for old_entry in self.redo_entries:
+            self.total_bytes -= self._entry_size(old_entry)
+        self.redo_entries = []
+
+        self.undo_entries.append(entry)
+        self.total_bytes += self._entry_size(entry)
+        self.text = text
+        if tags_changed:
+            self.tags = entry["tags_after"]
+        self._enforce_limits()
+        return True
+
+    def _enforce_limits(self):
+        """Mantém o histórico dentro dos limites, fundindo as entradas mais antigas antes de descartá-las."""
+        while len(self.undo_entries) > self.max_steps:
+            if not self._coalesce_oldest():
+                self._drop_oldest()
+        while self.total_bytes > self.max_bytes and len(self.undo_entries) > 1:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        """Descarta a entrada mais antiga do histórico."""
+        entry = self.undo_entries.pop(0)
+        self.total_bytes -= self._entry_size(entry)
+
+    def _coalesce_oldest(self):
+        """
+        Funde as duas entradas mais antigas em uma só, quando as regiões alteradas se tocam.
+
+        Retorna:
+            bool: True se a fusão foi possível.
+        """
+        first, second = self.undo_entries[0], self.undo_entries[1]
+        merged = self._merge_entries(first, second)
+        if merged is None:
+            return False
+        self.total_bytes -= self._entry_size(first) + self._entry_size(second)
+        self.undo_entries[0:2] = [merged]
+        self.total_bytes += self._entry_size(merged)
+        return True
+
+    @staticmethod
+    def _merge_entries(first, second):
+        """
+        Combina duas alterações consecutivas em uma única substituição.
+        Só é possível quando a região alterada pela segunda toca a região inserida pela primeira,
+        pois o texto intermediário fora dessas regiões não é guardado.
+        """
+        first_start, first_end = first["start"], first["start"] + len(first["inserted"])
+        second_start = second["start"]
+        second_end = second_start + len(second["removed"])
+        if second_start > first_end or first_start > second_end:
+            return None
+
+        # Reconstrói o trecho do estado intermediário que cobre as duas regiões
+        union_start = min(first_start, second_start)
+        if second_start <= first_start:
+            middle = second["removed"]
+            if first_end > second_end:
+                middle += first["inserted"][second_end - first_start :]
+        else:
+            middle = first["inserted"]
+            if second_end > first_end:
+                middle += second["removed"][first_end - second_start :]
+
+        before = apply_text_diff(
+            middle, first_start - union_start, first["inserted"], first["removed"]
+        )
+        after = apply_text_diff(
+            middle, second_start - union_start, second["removed"], second["inserted"]
+        )
+        return {
+            "start": union_start,
+            "removed": before,
+            "inserted": after,
+            "tags_before": (
+                first["tags_before"]
+                if first["tags_before"] is not None
+                else second["tags_before"]
+            ),
+            "tags_after": (
+                second["tags_after"]
+                if second["tags_after"] is not None
+                else first["tags_after"]
+            ),
+        }
+
+    def undo(self, text, tags):
+        """
+        Volta ao estado anterior. Alterações ainda não registradas são registradas antes.
+
+        Retorna:
+            tuple | None: (texto, tags) do estado restaurado, ou None se não houver o que desfazer.
+        """
+        self.record(text, tags)
+        if not self.undo_entries:
+            return None
+        entry = self.undo_entries.pop()
+        self.text = apply_text_diff(
+            self.text, entry["start"], entry["inserted"], entry["removed"]
+        )
+        if entry["tags_before"] is not None:
+            self.tags = entry["tags_before"]
+        self.redo_entries.append(entry)
+        return self.text, self.tags
+
+    def redo(self, text, tags):
+        """
+        Refaz a última alteração desfeita.
+
+        Retorna:
+            tuple | None: (texto, tags) do estado restaurado, ou None se não houver o que refazer.
+        """
+        # Editar depois de desfazer descarta o que podia ser refeito
+        if self.record(text, tags) or not self.redo_entries:
+            return None
+        entry = self.redo_entries.pop()
+        self.text = apply_text_diff(
+            self.text, entry["start"], entry["removed"], entry["inserted"]
+        )
+        if entry["tags_after"] is not None:
+            self.tags = entry["tags_after"]
+        self.undo_entries.append(entry)
+        return self.text, self.tags
+
+
 class NotepadManager:
     """
     Gerencia o conteúdo do bloco de notas, permitindo salvar e carregar textos e suas formatações.
+    O conteúdo completo fica em notepad.json e cada salvamento acrescenta apenas a diferença
+    em um diário (notepad.journal), que é incorporado ao arquivo principal de tempos em tempos.
     """
 
     def __init__(self):
-        self.notepad_path = os.path.join(os.path.dirname(sys.executable), NOTEPAD_FILE)
+        base_dir = os.path.dirname(sys.executable)
+        self.notepad_path = os.path.join(base_dir, NOTEPAD_FILE)
+        self.journal_path = os.path.join(base_dir, NOTEPAD_JOURNAL_FILE)
+        # Último estado gravado em disco (base + diário)
+        self.text = ""
+        self.tags = []
+        self.generation = 0
+        self.journal_size = 0
 
     def load_notepad(self):
         """
         Carrega o conteúdo do bloco de notas, retornando o texto e as formatações (tags).
+        As alterações registradas no diário são reaplicadas sobre o arquivo principal.
 
         Retorna:
             tuple: (texto, lista de tags) ou ("", []) se não for possível carregar.
         """
+        self.text, self.tags, self.generation = "", [], 0
         if os.path.exists(self.notepad_path):
             try:
                 with open(self.notepad_path, "r", encoding="utf-8") as file:
                     data = json.load(file)
-                    return data["text"], data["tags"]
+                    self.text, self.tags = data["text"], data["tags"]
+                    self.generation = data.get("generation", 0)
             except (FileNotFoundError, json.JSONDecodeError):
-                return "", []
-        return "", []
+                self.text, self.tags, self.generation = "", [], 0
+        self._replay_journal()
+        return self.text, self.tags
+
+    def _replay_journal(self):
+        """
+        Reaplica as alterações do diário sobre o conteúdo carregado.
+        Uma última linha incompleta (gravação interrompida) é descartada e removida do arquivo.
+        """
+        self.journal_size = 0
+        try:
+            with open(self.journal_path, "rb") as file:
+                raw = file.read()
+        except OSError:
+            return
+
+        valid_size = 0
+        header_ok = False
+        for line in raw.split(b"\n")[:-1]:
+            try:
+                entry = json.loads(line.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                break
+            if not header_ok:
+                # Diário de uma geração anterior: seu conteúdo já está no arquivo principal
+                if entry.get("generation") != self.generation:
+                    self._reset_journal()
+                    return
+                header_ok = True
+            else:
+                start = entry["s"]
+                self.text = (
+                    self.text[:start] + entry["i"] + self.text[start + entry["n"] :]
+                )
+                if "t" in entry:
+                    self.tags = entry["t"]
+            valid_size += len(line) + 1
+
+        if not header_ok:
+            self._reset_journal()
+            return
+        if valid_size != len(raw):
+            print(
+                "Diário do bloco de notas incompleto; descartando a última gravação parcial."
+            )
+            with open(self.journal_path, "r+b") as file:
+                file.truncate(valid_size)
+        self.journal_size = valid_size
+
+    def _reset_journal(self):
+        """Recria o diário vazio, marcado com a geração atual do arquivo principal."""
+        header = json.dumps({"generation": self.generation}) + "\n"
+        atomic_write_text(self.journal_path, header, encoding="utf-8", newline="\n")
+        self.journal_size = len(header.encode("utf-8"))
 
     def save_notepad(self, content, tags):
         """
-        Salva o conteúdo e as tags (formatações) no arquivo referente ao bloco de notas.
+        Salva o conteúdo e as tags (formatações) do bloco de notas.
+        Apenas a diferença em relação ao último salvamento é acrescentada ao diário;
+        quando o diário cresce demais, tudo é consolidado no arquivo principal.
 
         Parâmetros:
             content (str): Conteúdo do bloco de notas.
             tags (list): Lista de tags aplicadas ao texto.
         """
-        data = {"text": content, "tags": tags}
-        with open(self.notepad_path, "w", encoding="utf-8") as file:
-            json.dump(data, file, ensure_ascii=False, indent=4)
+        tags_changed = tags != self.tags
+        if not tags_changed and content == self.text:
+            return
+
+        if self.journal_size == 0:
+            self._reset_journal()
+
+        start, removed, inserted = text_diff(self.text, content)
+        entry = {"s": start, "n": len(removed), "i": inserted}
+        if tags_changed:
+            entry["t"] = tags
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with open(self.journal_path, "a", encoding="utf-8", newline="\n") as file:
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+        self.journal_size += len(line.encode("utf-8"))
+        self.text, self.tags = content, list(tags)
+
+        if self.journal_size > max(NOTEPAD_JOURNAL_MIN_BYTES, len(self.text)):
+            self.compact()
+
+    def compact(self):
+        """
+        Consolida o diário no arquivo principal.
+        O arquivo principal recebe uma nova geração antes de o diário ser esvaziado,
+        assim uma queda entre as duas etapas não reaplica alterações já incorporadas.
+        """
+        data = {"text": self.text, "tags": self.tags, "generation": self.generation + 1}
+        atomic_write_json(self.notepad_path, data, encoding="utf-8", ensure_ascii=False)
+        self.generation += 1
+        self._reset_journal()
+
+
+class AudioPlayer:
+    """
+    Toca o som de clique em uma thread própria, sem bloquear a interface.
+    O arquivo WAV é lido uma única vez (na primeira reprodução) e mantido em memória.
+    As subclasses implementam _load e _play para cada biblioteca de áudio.
+
+    Parâmetros:
+        wav_path (str): Caminho do arquivo WAV.
+    """
+
+    name = "nenhum"
+
+    def __init__(self, wav_path):
+        self.wav_path = wav_path
+        self.available = True  # Passa a False se o carregamento ou a reprodução falhar
+        self.loaded = False
+        # Cliques repetidos enquanto um som está na fila são descartados
+        self.pending = queue.Queue(maxsize=1)
+        self.thread = None
+
+    def play(self):
+        """Pede a reprodução do som e retorna imediatamente."""
+        if not self.available:
+            return
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._worker, daemon=True)
+            self.thread.start()
+        try:
+            self.pending.put_nowait(True)
+        except queue.Full:
+            pass
+
+    def close(self):
+        """Encerra a thread de áudio (descartando um clique pendente); o reprodutor não toca mais."""
+        self.available = False
+        if self.thread is None:
+            return
+        try:
+            self.pending.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self.pending.put_nowait(None)  # Sinal de parada para _worker
+        except queue.Full:
+            pass
+        self.thread = None
+
+    def _worker(self):
+        """Laço da thread de áudio: carrega o som na primeira vez e atende os pedidos até close()."""
+        while True:
+            if self.pending.get() is None:
+                return
+            try:
+                if not self.loaded:
+                    self._load()
+                    self.loaded = True
+                self._play()
+            except Exception as e:
+                print(f"Erro no áudio ({self.name}): {e}")
+                self.available = False
+                return
+
+    def _load(self):
+        """Carrega o som em memória."""
+
+    def _play(self):
+        """Reproduz o som carregado."""
+
+
+class WinsoundPlayer(AudioPlayer):
+    """Reproduz o WAV a partir da memória com o winsound (Windows, sem dependências extras)."""
+
+    name = "winsound"
+
+    def _load(self):
+        import winsound
+
+        self.winsound = winsound
+        with open(self.wav_path, "rb") as file:
+            self.data = file.read()
+
+    def _play(self):
+        # SND_MEMORY não aceita SND_ASYNC, por isso a reprodução fica nesta thread
+        self.winsound.PlaySound(
+            self.data, self.winsound.SND_MEMORY | self.winsound.SND_NODEFAULT
+        )
+
+
+class SimpleaudioPlayer(AudioPlayer):
+    """Reproduz as amostras PCM do WAV, decodificadas uma vez, com o simpleaudio."""
+
+    name = "simpleaudio"
+
+    def _load(self):
+        import simpleaudio
+        import wave
+
+        self.simpleaudio = simpleaudio
+        with wave.open(self.wav_path, "rb") as wav:
+            self.frames = wav.readframes(wav.getnframes())
+            self.params = (wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+
+    def _play(self):
+        self.simpleaudio.play_buffer(self.frames, *self.params).wait_done()
+
+
+class PygamePlayer(AudioPlayer):
+    """Reproduz o som com o mixer do pygame (importado só quando este backend é usado)."""
+
+    name = "pygame"
+
+    def _load(self):
+        pygame.mixer.init()
+        self.sound = pygame.mixer.Sound(self.wav_path)
+
+    def _play(self):
+        pygame.mixer.find_channel(True).play(self.sound)
+
+
+AUDIO_PLAYERS = {
+    "winsound": WinsoundPlayer,
+    "simpleaudio": SimpleaudioPlayer,
+    "pygame": PygamePlayer,
+    "nenhum": AudioPlayer,
+}
+
+
+def create_audio_player(backend, wav_path):
+    """
+    Cria o reprodutor do som de clique.
+
+    Parâmetros:
+        backend (str): "auto" ou um dos nomes de AUDIO_PLAYERS.
+        wav_path (str): Caminho do arquivo WAV.
+
+    Retorna:
+        AudioPlayer: Reprodutor escolhido. No modo "auto", o winsound é usado no Windows;
+        nos demais sistemas, o simpleaudio se estiver instalado, senão o pygame.
+    """
+    if backend in AUDIO_PLAYERS:
+        return AUDIO_PLAYERS[backend](wav_path)
+    if backend != "auto":
+        print(f"Backend de áudio desconhecido: {backend}; usando seleção automática.")
+    if os.name == "nt":
+        return WinsoundPlayer(wav_path)
+    try:
+        import simpleaudio  # noqa: F401
+
+        return SimpleaudioPlayer(wav_path)
+    except ImportError:
+        return PygamePlayer(wav_path)
+
+
+def _import_pil():
+    """Importa o Pillow, se estiver instalado (opcional: escala de imagens e suporte a JPEG)."""
+    try:
+        from PIL import Image, ImageTk
+    except ImportError:
+        return None
+    return Image, ImageTk
+
+
+class ImageCache:
+    """
+    Cache das imagens de fundo, identificadas por caminho, data de modificação e tamanho do arquivo.
+    Cada arquivo é decodificado uma única vez; a decodificação e as versões ajustadas ao tamanho
+    do canvas são feitas em uma thread separada (com o Pillow, importado só nesse momento) e
+    reaproveitadas entre recriações da interface.
+    Sem o Pillow, a imagem é exibida no tamanho original via tk.PhotoImage (apenas PNG/GIF).
+
+    Parâmetros:
+        root (tk.Tk): Janela principal, usada para receber os resultados da thread.
+    """
+
+    MAX_SCALED = 3  # Tamanhos mantidos em memória por imagem
+
+    def __init__(self, root):
+        self.root = root
+        self._pil = None
+        self._pil_checked = False
+        self.originals = {}  # chave do arquivo -> imagem do Pillow decodificada
+        self.base_photos = {}  # chave do arquivo -> PhotoImage original (sem o Pillow)
+        self.scaled_photos = {}  # (chave, largura, altura) -> PhotoImage ajustada
+        self.lock = threading.Lock()
+        self.results = queue.Queue()
+        self.generation = 0
+        self.pending = 0  # Threads de ajuste que ainda não entregaram o resultado
+        self.poll_job = None
+
+    @property
+    def pil(self):
+        """Módulos (Image, ImageTk) do Pillow, importados no primeiro uso, ou None se não instalado."""
+        if not self._pil_checked:
+            self._pil = _import_pil()
+            self._pil_checked = True
+        return self._pil
+
+    @property
+    def can_scale(self):
+        """Indica se o Pillow está disponível para ajustar as imagens ao canvas (importa-o se preciso)."""
+        return self.pil is not None
+
+    @property
+    def may_scale(self):
+        """Indica se o Pillow está disponível ou ainda não foi verificado, sem importá-lo."""
+        return not self._pil_checked or self._pil is not None
+
+    @staticmethod
+    def file_key(path):
+        """
+        Retorna a chave de cache do arquivo.
+
+        Exceções:
+            OSError: Se o arquivo não existir.
+        """
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+    def preload(self, path):
+        """
+        Prepara a exibição do arquivo.
+        Com o Pillow (ou enquanto ele não foi verificado), a decodificação fica para a thread de
+        request_scaled e a imagem exibida será a versão ajustada; sem ele, decodifica o arquivo
+        (apenas na primeira vez) e retorna a imagem no tamanho original.
+
+        Retorna:
+            tk.PhotoImage ou None: Imagem original (somente sem o Pillow).
+
+        Exceções:
+            OSError, tk.TclError: Se o arquivo não existir ou não puder ser decodificado.
+        """
+        key = self.file_key(path)
+        if self.may_scale:
+            return None
+        photo = self.base_photos.get(key)
+        if photo is None:
+            photo = tk.PhotoImage(file=path)
+            self._forget_other_versions(self.base_photos, key)
+            self.base_photos[key] = photo
+        return photo
+
+    def scaled_photo(self, path, width, height):
+        """Retorna a versão já ajustada ao tamanho informado, ou None se ainda não foi gerada."""
+        try:
+            key = self.file_key(path)
+        except OSError:
+            return None
+        return self.scaled_photos.get((key, width, height))
+
+    def request_scaled(self, path, width, height, callback):
+        """
+        Gera em segundo plano a versão da imagem que cobre width x height (cortando o excesso)
+        e chama callback(photo) no loop do Tk. Pedidos anteriores ainda pendentes são descartados.
+        Se o Pillow não estiver instalado, callback recebe a imagem no tamanho original.
+        """
+        if not self.may_scale:
+            return
+        try:
+            key = self.file_key(path)
+        except OSError:
+            return
+        self.generation += 1
+        generation = self.generation
+
+        def worker():
+            # Sempre entrega um resultado (imagem, None sem o Pillow, ou erro) para encerrar a consulta
+            image = error = None
+            try:
+                if self.pil is not None:
+                    image = self._scale(self._original(key), width, height)
+            except Exception as e:
+                print(f"Erro ao ajustar imagem de fundo: {e}")
+                error = e
+            self.results.put(
+                (generation, path, key, width, height, image, error, callback)
+            )
+
+        self.pending += 1
+        threading.Thread(target=worker, daemon=True).start()
+        if self.poll_job is None:
+            self.poll_job = self.root.after(30, self._poll_results)
+
+    def _poll_results(self):
+        """
+        Converte os resultados da thread em PhotoImage (só pode ser feito na thread do Tk).
+        A consulta para quando todas as threads entregaram o resultado.
+        """
+        self.poll_job = None
+        while True:
+            try:
+                generation, path, key, width, height, image, error, callback = (
+                    self.results.get_nowait()
+                )
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if generation != self.generation or error is not None:
+                continue  # Pedido substituído por um mais recente, ou falhou
+            if image is None:
+                # Pillow não instalado: exibe a imagem original decodificada pelo Tk
+                try:
+                    callback(self.preload(path))
+                except (OSError, tk.TclError) as e:
+                    print(f"Erro ao carregar imagem de fundo: {e}")
+                continue
+            photo = self.pil[1].PhotoImage(image)
+            self.scaled_photos[(key, width, height)] = photo
+            while len(self.scaled_photos) > self.MAX_SCALED:
+                del self.scaled_photos[next(iter(self.scaled_photos))]
+            callback(photo)
+        if self.pending > 0:
+            self.poll_job = self.root.after(30, self._poll_results)
+
+    def _original(self, key):
+        """Decodifica o arquivo com o Pillow uma única vez (seguro para chamar de outra thread)."""
+        with self.lock:
+            image = self.originals.get(key)
+            if image is None:
+                with self.pil[0].open(key[0]) as source:
+                    image = source.convert(
+                        "RGBA" if "A" in source.getbands() else "RGB"
+                    )
+                self._forget_other_versions(self.originals, key)
+                self.originals[key] = image
+            return image
+
+    def _scale(self, image, width, height):
+        """Redimensiona a imagem para cobrir width x height, cortando o excesso de forma centralizada."""
+        ratio = max(width / image.width, height / image.height)
+        size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+        scaled = image.resize(size, self.pil[0].LANCZOS)
+        left = (size[0] - width) // 2
+        top = (size[1] - height) // 2
+        return scaled.crop((left, top, left + width, top + height))
+
+    @staticmethod
+    def _forget_other_versions(cache, key):
+        """Remove versões antigas do mesmo arquivo (modificado) e limita o cache a duas imagens."""
+        for other in list(cache):
+            if other[0] == key[0] and other != key:
+                del cache[other]
+        while len(cache) >= 2:
+            del cache[next(iter(cache))]
 
 
 class Tooltip:
@@ -494,29 +2650,50 @@ class SupportApp:
 
         try:
             if getattr(sys, "frozen", False):
-                icon_path = os.path.join(sys._MEIPASS, "ico.ico")
+                icon_path = get_resource_path("ico.ico")
                 self.root.iconbitmap(icon_path)
         except Exception as e:
             print(f"Icone não carregado: {e}")
 
-        self.current_version = "3.5"
-        self.updater = Updater(self.current_version)
-        self.check_updates()
-
         # Inicializa os gerenciadores
-        self.config_manager = ConfigManager()
-        self.text_manager = TextManager()
+        with perf_monitor.phase("ConfigManager"):
+            self.config_manager = ConfigManager(self.root)
+        with perf_monitor.phase("TextManager"):
+            self.text_manager = TextManager(
+                storage=self.config_manager.config.get("texts_storage", "json")
+            )
         self.notepad_manager = NotepadManager()
+        self.performance_log_path = os.path.join(
+            os.path.dirname(sys.executable), PERFORMANCE_LOG_FILE
+        )
 
         # Carrega as configurações
         self.config = self.config_manager.config
         self.texts = self.text_manager.texts
 
-        # Inicialização do áudio com sistema de fallback
-        self.initialize_audio()
+        self.current_version = APP_VERSION
+        self.updater = Updater(
+            self.current_version,
+            timeout=self.config.get("update_check_timeout", UPDATE_CHECK_TIMEOUT),
+            channel=self.config.get("update_channel", "stable"),
+            cache_path=os.path.join(
+                os.path.dirname(sys.executable), VERSION_CACHE_FILE
+            ),
+        )
+        self.update_queue = queue.Queue()
+        self.update_thread = None
+
+        # O áudio só é carregado no primeiro clique com som ativado
+        with perf_monitor.phase("initialize_audio"):
+            self.initialize_audio()
 
         # Variável para armazenar a categoria atual
         self.current_category = "Todas"
+        # Texto digitado na barra de busca (vazio = sem filtro)
+        self.search_query = ""
+        # O índice de busca é construído em etapas, quando a interface está ociosa
+        self.text_manager.start_search_index()
+        self.root.after_idle(self._build_search_index)
 
         # Define a geometria inicial
         initial_size = self.config.get(
@@ -530,19 +2707,23 @@ class SupportApp:
         self.root.geometry(initial_size)
         self.root.update_idletasks()  # Força atualização do layout
 
-        # Initialize button_windows
-        self.button_windows = []
+        # Botões exibidos no canvas (célula da grade -> widgets e último estado desenhado)
+        self.button_items = {}
+        self.filtered_ids = []
         # Drag-and-drop mode for reordering buttons
         self.drag_mode = False
         self._drag_data = {"widget": None, "start_idx": None, "drag_window": None}
+        # Imagens de fundo decodificadas e ajustadas, reaproveitadas entre recriações da interface
+        self.image_cache = ImageCache(self.root)
+        # Histórico de desfazer/refazer do bloco de notas
+        self.undo_history = UndoHistory(
+            max_steps=self.config.get("notepad_undo_steps", NOTEPAD_UNDO_STEPS),
+            max_bytes=self.config.get("notepad_undo_max_kb", NOTEPAD_UNDO_MAX_KB)
+            * 1024,
+        )
 
         self.setup_ui()
-        pygame.mixer.init()
-        self.click_sound = None
-        self.load_sound()
 
-        # Inicializa pilhas de undo
-        self.undo_stack = []
         self.user_script = ""  # Armazena o script do usuário
         # Define o arquivo para salvar o script (na mesma pasta do executável)
         self.script_file = os.path.join(
@@ -550,60 +2731,255 @@ class SupportApp:
         )
         self.load_user_script()
 
-    def initialize_audio(self):
-        """Inicializa o sistema de áudio com fallback e logging apropriado."""
-        self.audio_available = False
-        self.click_sound = None
+        # Garante que configurações pendentes sejam gravadas ao fechar a janela
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        if not self.config["sound_enabled"]:
-            print("Som desativado nas configurações.")
-            return
+        # A verificação de atualizações roda em segundo plano, depois que a janela já foi exibida
+        self.root.after(1000, self.check_updates)
+        self._schedule_notepad_autosave()
 
+    def on_close(self):
+        """Grava as alterações pendentes e encerra o aplicativo, mesmo se alguma gravação falhar."""
         try:
-            pygame.mixer.quit()  # Garante que não há instância anterior
-            pygame.mixer.init()
-            self.audio_available = True
-            print("Sistema de áudio inicializado com sucesso.")
+            self.config_manager.flush()
+            if hasattr(self, "notepad_text"):
+                try:
+                    self.save_notepad()
+                except (OSError, tk.TclError) as e:
+                    print(f"Erro ao salvar o bloco de notas ao fechar: {e}")
+                    messagebox.showerror(
+                        "Erro",
+                        f"Não foi possível salvar o bloco de notas.\n\nDetalhes: {e}",
+                    )
+            perf_monitor.write_log(self.performance_log_path)
+        finally:
+            self.root.destroy()
 
-            try:
-                self.click_sound = pygame.mixer.Sound("click.wav")
-                print("Som de clique carregado com sucesso.")
-            except Exception as e:
-                print(f"Aviso: Não foi possível carregar o som de clique: {e}")
-                self.audio_available = False
+    def initialize_audio(self):
+        """
+        Prepara o estado do áudio sem carregar nenhuma biblioteca de som.
+        O reprodutor é criado em _ensure_audio, no primeiro uso.
+        """
+        self.audio_player = None
 
-        except Exception as e:
-            print(f"Aviso: Sistema de áudio não disponível: {e}")
+    def _ensure_audio(self):
+        """
+        Cria o reprodutor do som de clique na primeira vez que é necessário.
+        Se uma reprodução anterior falhou, desativa o som e avisa no menu.
+
+        Retorna:
+            bool: True se o som de clique pode ser tocado.
+        """
+        if self.audio_player is None:
+            self.audio_player = create_audio_player(
+                self.config.get("audio_backend", "auto"), "click.wav"
+            )
+            print(f"Áudio: usando o backend {self.audio_player.name}.")
+
+        if not self.audio_player.available:
             self.config["sound_enabled"] = False
-            self.config_manager.save_config()
-            print("Som desativado automaticamente devido a problemas de inicialização.")
+            self.config_manager.schedule_save()
+            self.sound_menu.entryconfig(0, label="Erro - Som Desativado")
+            print("Som desativado automaticamente devido a problemas no áudio.")
+            return False
+        return True
 
-    def check_updates(self):
+    @perf_monitor.timed("check_updates")
+    def check_updates(self, manual=False):
         """
-        Verifica e notifica sobre atualizações disponíveis chamando o Updater.
+        Inicia a verificação de atualizações em uma thread separada, para não travar a interface.
+
+        A verificação automática respeita o modo offline e o intervalo mínimo entre consultas.
+
+        Parâmetros:
+            manual (bool): Se True, ignora o modo offline e o intervalo (verificação pedida pelo usuário).
         """
-        version_info = self.updater.check_for_updates()
+        if self.update_thread and self.update_thread.is_alive():
+            return
+
+        if not manual:
+            if self.config.get("offline_mode"):
+                print("Modo offline ativo: verificação de atualizações ignorada.")
+                return
+            interval = (
+                self.config.get(
+                    "update_check_interval_hours", UPDATE_CHECK_INTERVAL_HOURS
+                )
+                * 3600
+            )
+            last_check = self.config.get("last_update_check", 0)
+            if time.time() - last_check < interval:
+                print(
+                    "Atualizações verificadas recentemente; próxima verificação adiada."
+                )
+                return
+
+        self.updater.timeout = self.config.get(
+            "update_check_timeout", UPDATE_CHECK_TIMEOUT
+        )
+        self.updater.channel = self.config.get("update_channel", "stable")
+
+        def worker():
+            # Entrega (versão disponível ou None, erro ou None) para distinguir falha de "sem novidades"
+            with perf_monitor.phase("check_for_updates (thread)"):
+                try:
+                    result = (self.updater.check_for_updates(raise_errors=True), None)
+                except Exception as e:
+                    result = (None, e)
+            self.update_queue.put(result)
+
+        self.update_thread = threading.Thread(target=worker, daemon=True)
+        self.update_thread.start()
+        self.root.after(200, lambda: self._poll_update_result(manual))
+
+    def _poll_update_result(self, manual):
+        """Consulta o resultado da thread de atualização a partir do loop do Tk."""
+        try:
+            version_info, error = self.update_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(200, lambda: self._poll_update_result(manual))
+            return
+
+        if error is not None:
+            # Sem gravar last_update_check: a próxima abertura tenta de novo
+            if manual:
+                messagebox.showwarning(
+                    "Atualizações",
+                    "Não foi possível consultar o servidor de atualizações.\n"
+                    "Verifique a conexão com a internet e tente novamente.",
+                )
+            return
+
+        self.config["last_update_check"] = time.time()
+        self.config_manager.schedule_save()
+
         if version_info:
             if messagebox.askyesno(
                 "Atualização Disponível",
                 f"Uma nova versão ({version_info['version']}) está disponível. Deseja atualizar agora?",
             ):
-                self.updater.download_and_install(version_info["download_url"])
+                self.config_manager.flush()
+                self.start_update_download(version_info)
+        elif manual:
+            messagebox.showinfo(
+                "Atualizações", "Você já está usando a versão mais recente."
+            )
 
-    def load_sound(self):
+    def start_update_download(self, version_info):
         """
-        Inicializa o som para clique dos botões (usando pygame) e trata falhas de carregamento.
+        Baixa a atualização em uma thread separada, exibindo uma janela de progresso.
+        Ao final (download verificado), o executável é substituído pelo Updater.
+
+        Parâmetros:
+            version_info (dict): Dados do version.json (download_url e, opcionalmente, sha256).
         """
+        expected_sha256 = version_info.get("sha256")
+        if not expected_sha256 and not messagebox.askyesno(
+            "Atualização sem verificação",
+            "Esta versão não publica um checksum SHA-256, então o download não poderá ser verificado.\n"
+            "Deseja continuar mesmo assim?",
+        ):
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Baixando Atualização")
+        dialog.resizable(False, False)
+        dialog.transient(self.root)
+
+        status_label = ttk.Label(dialog, text="Conectando...")
+        status_label.pack(padx=15, pady=(15, 5))
+        progress_bar = ttk.Progressbar(dialog, length=300, mode="determinate")
+        progress_bar.pack(padx=15, pady=5)
+
+        cancel_event = threading.Event()
+        ttk.Button(dialog, text="Cancelar", command=cancel_event.set).pack(pady=(5, 15))
+        dialog.protocol("WM_DELETE_WINDOW", cancel_event.set)
+
+        download = {
+            "dialog": dialog,
+            "label": status_label,
+            "bar": progress_bar,
+            "queue": queue.Queue(),
+        }
+
+        def worker():
+            try:
+                path = self.updater.download_update(
+                    version_info,
+                    progress=lambda done, total: download["queue"].put(
+                        ("progress", done, total)
+                    ),
+                    cancel_event=cancel_event,
+                )
+                download["queue"].put(("done", path))
+            except Exception as e:
+                download["queue"].put(("error", e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(100, lambda: self._poll_update_download(download))
+
+    def _poll_update_download(self, download):
+        """Atualiza a janela de progresso com as mensagens da thread de download."""
+        last_progress = None
         try:
-            self.click_sound = pygame.mixer.Sound("click.wav")
-        except Exception as e:
-            print(f"Erro ao carregar som: {e}")
-            self.config["sound_enabled"] = False
-            self.sound_menu.entryconfig(0, label="Erro - Som Desativado")
+            while True:
+                message = download["queue"].get_nowait()
+                if message[0] == "progress":
+                    # Só a última posição interessa para a barra
+                    last_progress = message
+                    continue
+                download["dialog"].destroy()
+                if message[0] == "done":
+                    self.updater.install(message[1])
+                elif isinstance(message[1], UpdateCancelled):
+                    print("Download da atualização cancelado.")
+                else:
+                    print(f"Falha no download da atualização: {message[1]}")
+                    messagebox.showerror(
+                        "Erro de Atualização", f"Detalhes: {message[1]}"
+                    )
+                return
+        except queue.Empty:
+            pass
+
+        if last_progress:
+            _, done, total = last_progress
+            if total:
+                download["bar"].configure(mode="determinate", maximum=total, value=done)
+                download["label"].configure(
+                    text=f"{done / 1048576:.1f} de {total / 1048576:.1f} MB"
+                )
+            else:
+                download["label"].configure(text=f"{done / 1048576:.1f} MB baixados")
+        self.root.after(100, lambda: self._poll_update_download(download))
+
+    def toggle_offline_mode(self):
+        """Ativa/desativa o modo offline, que suspende a verificação automática de atualizações."""
+        self.config["offline_mode"] = not self.config.get("offline_mode", False)
+        self.help_menu.entryconfig(
+            1,
+            label=(
+                "Desativar Modo Offline"
+                if self.config["offline_mode"]
+                else "Ativar Modo Offline"
+            ),
+        )
+        self.config_manager.schedule_save()
+
+    def toggle_update_channel(self):
+        """Alterna entre os canais de atualização estável e beta."""
+        beta = self.config.get("update_channel") != "beta"
+        self.config["update_channel"] = "beta" if beta else "stable"
+        self.help_menu.entryconfig(
+            2, label="Desativar Canal Beta" if beta else "Ativar Canal Beta"
+        )
+        self.config_manager.schedule_save()
 
+    @perf_monitor.timed("setup_ui")
     def setup_ui(self):
         """Configura a interface gráfica (UI), criando canvas, botões, menus e blocos de notas."""
         self.root.configure(bg=self.config["bg_color"])
+        self.create_search_bar()
         self.create_canvas()
         self.load_bg_image()
         self.create_buttons()
@@ -631,18 +3007,87 @@ class SupportApp:
                 self.config["window_size_notepad"] = current_geometry
             else:
                 self.config["window_size_normal"] = current_geometry
-            self.config_manager.save_config()
+            self.config_manager.schedule_save()
+
+    def create_search_bar(self):
+        """Cria a barra de busca acima dos botões; os botões são filtrados enquanto o usuário digita."""
+        bg_color = self.config["bg_color"]
+        self.search_frame = tk.Frame(self.root, bg=bg_color)
+        self.search_frame.pack(fill="x", side="top")
+
+        tk.Label(
+            self.search_frame,
+            text="🔍",
+            bg=bg_color,
+            fg=self.get_contrast_color(bg_color),
+        ).pack(side="left", padx=(10, 2))
+
+        self.search_var = tk.StringVar(self.root, value=self.search_query)
+        self.search_entry = ttk.Entry(self.search_frame, textvariable=self.search_var)
+        self.search_entry.pack(side="left", fill="x", expand=True, padx=(0, 10), pady=4)
+        Tooltip(self.search_entry, "Buscar por nome, texto ou categoria (Ctrl+F)")
+
+        self.search_var.trace_add("write", lambda *args: self.on_search_change())
+        self.search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
+        self.root.bind("<Control-f>", self._on_search_shortcut)
+
+    def _on_search_shortcut(self, event):
+        """Ctrl+F: foca a barra de busca, apenas se o foco estiver na janela principal."""
+        toplevel = getattr(event.widget, "winfo_toplevel", None)
+        if toplevel is None or toplevel() is not self.root:
+            return None  # Outra janela (bloco de notas, Space Snake, diálogos)
+        self.search_entry.focus_set()
+        return "break"
+
+    def _build_search_index(self):
+        """
+        Indexa mais uma parte dos textos e agenda a próxima. Até o índice ficar pronto a
+        busca filtra a lista diretamente; ao completar, uma busca ativa é refeita com ele.
+        """
+        if not self.text_manager.index_pending_texts():
+            self.root.after_idle(self._build_search_index)
+        elif self.search_query.strip():
+            self.refresh_buttons()
+
+    def on_search_change(self):
+        """Refiltra os botões com o texto atual da barra de busca."""
+        self.search_query = self.search_var.get()
+        self.canvas.xview_moveto(0)
+        self.refresh_buttons()
 
     def create_canvas(self):
-        self.canvas = tk.Canvas(self.root, bg=self.config["bg_color"])
+        # Um canvas novo não tem nenhum dos botões desenhados anteriormente
+        self.button_items = {}
+        self.button_pool = []
+        self.grid_scrollregion = None
+        self.grid_render_job = None
+        self.bg_item = None
+        self.bg_resize_job = None
+        self.canvas = tk.Canvas(
+            self.root, bg=self.config["bg_color"], xscrollincrement=COLUMN_WIDTH
+        )
         self.canvas.pack(fill="both", expand=True)
 
+        # Barra de rolagem horizontal, exibida só quando as colunas não cabem na janela
+        self.grid_scrollbar = ttk.Scrollbar(
+            self.root, orient="horizontal", command=self.canvas.xview
+        )
+        self.canvas.configure(xscrollcommand=self._on_grid_xscroll)
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+        self._bind_grid_mousewheel(self.canvas)
+
+    @perf_monitor.timed("load_bg_image")
     def load_bg_image(self):
-        """Carrega a imagem de fundo padrão ou personalizada"""
+        """
+        Carrega a imagem de fundo padrão ou personalizada.
+        A imagem vem do cache (decodificada uma única vez) e é ajustada ao canvas em segundo plano.
+        """
         self.bg_image = None  # Inicializa bg_image como None
+        bg_loaded = False
 
         try:
-            self.bg_image = tk.PhotoImage(file=self.config["bg_image_path"])
+            self.bg_image = self._cached_bg_photo(self.config["bg_image_path"])
+            bg_loaded = True
         except Exception as e:
             print(f"Erro ao carregar imagem: {e}")
 
@@ -654,119 +3099,308 @@ class SupportApp:
                 new_image_path = self.select_bg_image()
                 if new_image_path:
                     self.config["bg_image_path"] = new_image_path
-                    self.bg_image = tk.PhotoImage(file=new_image_path)
-                    self.config_manager.save_config()
+                    self.bg_image = self._cached_bg_photo(new_image_path)
+                    bg_loaded = True
+                    self.config_manager.schedule_save()
                 else:
                     # Se o usuário não selecionar uma nova imagem, inicia sem plano de fundo
                     self.canvas.configure(bg=self.config["bg_color"])
                     return
 
         # Adiciona a imagem ao canvas já criado, se a imagem foi carregada com sucesso
-        if self.bg_image:
-            self.canvas.create_image(0, 0, image=self.bg_image, anchor="nw")
+        # (com o Pillow, a versão ajustada ao canvas pode chegar logo depois)
+        if bg_loaded:
+            self.bg_item = self.canvas.create_image(
+                self.canvas.canvasx(0), 0, image=self.bg_image or "", anchor="nw"
+            )
+            self._schedule_bg_resize()
+
+    def _cached_bg_photo(self, path):
+        """Retorna a imagem já ajustada ao tamanho atual do canvas, se houver, ou a carregada do cache."""
+        photo = self.image_cache.scaled_photo(
+            path, self.canvas.winfo_width(), self.canvas.winfo_height()
+        )
+        return photo or self.image_cache.preload(path)
+
+    def _schedule_bg_resize(self):
+        """Agenda (com debounce) o ajuste da imagem de fundo ao tamanho do canvas."""
+        if not self.image_cache.may_scale or self.bg_item is None:
+            return
+        if self.bg_resize_job is not None:
+            self.root.after_cancel(self.bg_resize_job)
+        # Sem imagem na tela ainda, o ajuste é pedido sem esperar o fim do redimensionamento
+        delay = BG_RESIZE_DEBOUNCE_MS if self.bg_image else 1
+        self.bg_resize_job = self.root.after(delay, self._resize_bg_image)
+
+    def _resize_bg_image(self):
+        """Pede ao cache a imagem de fundo no tamanho atual do canvas."""
+        self.bg_resize_job = None
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            return  # Canvas ainda não foi exibido
+        path = self.config["bg_image_path"]
+        photo = self.image_cache.scaled_photo(path, width, height)
+        if photo:
+            self._apply_bg_photo(photo)
+        else:
+            self.image_cache.request_scaled(path, width, height, self._apply_bg_photo)
+
+    def _apply_bg_photo(self, photo):
+        """Troca a imagem exibida no fundo do canvas."""
+        if self.bg_item is None or not self.canvas.winfo_exists():
+            return
+        self.bg_image = photo
+        self.canvas.itemconfigure(self.bg_item, image=photo)
+
+    def _bg_filetypes(self):
+        """Tipos de arquivo aceitos como fundo (JPEG depende do Pillow)."""
+        if self.image_cache.can_scale:
+            return [("Image files", "*.png *.gif *.jpg *.jpeg")]
+        return [("Image files", "*.png")]
 
     def select_bg_image(self):
         file_path = filedialog.askopenfilename(
-            title="Selecione a imagem de fundo", filetypes=[("Image files", "*.png")]
+            title="Selecione a imagem de fundo", filetypes=self._bg_filetypes()
         )
         return file_path if file_path else DEFAULT_BG_IMAGE_PATH
 
     def create_widgets(self):
-        self.canvas = tk.Canvas(self.root, bg=self.config["bg_color"])
-        self.canvas.pack(fill="both", expand=True)
+        self.create_canvas()
 
         if self.bg_image:
-            self.canvas.create_image(0, 0, image=self.bg_image, anchor="nw")
+            self.bg_item = self.canvas.create_image(
+                0, 0, image=self.bg_image, anchor="nw"
+            )
 
         self.create_buttons()
 
+    @perf_monitor.timed("create_buttons")
     def create_buttons(self):
-        # Limpar botões existentes
-        for btn in self.button_windows:
-            self.canvas.delete(btn)
-        self.button_windows = []
-        # Configurações de posicionamento
-        start_x, start_y = 10, 10
-        button_width = 150
-        button_height = 30
-        padding = 5
-        max_colunas = 8
-        bots_por_coluna = 10
-        # Filtra textos por categoria
-        filtered_texts = self.texts
-        if self.current_category != "Todas":
-            filtered_texts = [
-                text
-                for text in self.texts
-                if len(text) >= 3 and text[2] == self.current_category
-            ]
-        # Map from filtered_texts index to self.texts index
-        filtered_indices = [self.texts.index(item) for item in filtered_texts]
-        for idx, text_item in enumerate(filtered_texts):
-            # Garante que text_item sempre tenha 3 elementos
-            if len(text_item) == 2:
-                text, resumo = text_item
-                category = "Geral"
-            else:
-                text, resumo, category = text_item
-            col = idx // bots_por_coluna
-            linha = idx % bots_por_coluna
-            if col >= max_colunas:
-                break
-            x = start_x + (col * 185)
-            y = start_y + (linha * (button_height + padding))
-            btn = ttk.Button(
+        """
+        Recalcula a lista de textos exibidos (filtrada pela categoria e pela busca) e redesenha a grade.
+
+        A grade é virtualizada: só existem widgets para as colunas visíveis no canvas, e eles
+        são reaproveitados durante a rolagem (ver _render_visible_buttons).
+        """
+        query = self.search_query.strip()
+        if query:
+            # Resultados da busca, do mais relevante ao menos relevante
+            self.filtered_ids = self.text_manager.search(query)
+            if self.current_category != "Todas":
+                category_ids = self.text_manager.category_ids.get(
+                    self.current_category, {}
+                )
+                self.filtered_ids = [i for i in self.filtered_ids if i in category_ids]
+        elif self.current_category == "Todas":
+            self.filtered_ids = list(self.text_manager.ids)
+        else:
+            # Textos da categoria, obtidos pelo índice de categorias
+            self.filtered_ids = self.text_manager.ids_in_category(self.current_category)
+
+        total_colunas = max(1, -(-len(self.filtered_ids) // BUTTONS_PER_COLUMN))
+        total_width = GRID_MARGIN + (total_colunas * COLUMN_WIDTH)
+        total_height = GRID_MARGIN + (
+            BUTTONS_PER_COLUMN * (BUTTON_HEIGHT + BUTTON_PADDING)
+        )
+        scrollregion = (0, 0, total_width, total_height)
+        # Só reconfigura se mudou, para não disparar o xscrollcommand à toa
+        if scrollregion != self.grid_scrollregion:
+            self.canvas.config(scrollregion=scrollregion)
+            self.grid_scrollregion = scrollregion
+        self._update_grid_scrollbar()
+        self._render_visible_buttons()
+
+    def _render_visible_buttons(self):
+        """
+        Sincroniza os widgets com as células visíveis da grade.
+
+        Células que saíram da área visível devolvem seus widgets ao pool; as que entraram
+        reutilizam widgets do pool. Em cada widget só é alterado o que mudou
+        (posição, rótulo, texto copiado, botão de edição).
+        """
+        self.grid_render_job = None
+        view_left = self.canvas.canvasx(0)
+        view_right = view_left + max(self.canvas.winfo_width(), COLUMN_WIDTH)
+        # Uma coluna extra de cada lado deixa a rolagem sem "buracos"
+        first_col = max(0, int((view_left - GRID_MARGIN) // COLUMN_WIDTH) - 1)
+        last_col = int((view_right - GRID_MARGIN) // COLUMN_WIDTH) + 1
+        first_slot = first_col * BUTTONS_PER_COLUMN
+        last_slot = min(len(self.filtered_ids), (last_col + 1) * BUTTONS_PER_COLUMN)
+
+        # Devolve ao pool os widgets das células que não estão mais visíveis
+        for slot in [s for s in self.button_items if not first_slot <= s < last_slot]:
+            item = self.button_items.pop(slot)
+            self._hide_button_item(item)
+            self.button_pool.append(item)
+
+        for slot in range(first_slot, last_slot):
+            text_id = self.filtered_ids[slot]
+            text, resumo, category = self.text_manager.get_text(text_id)
+            col = slot // BUTTONS_PER_COLUMN
+            linha = slot % BUTTONS_PER_COLUMN
+            x = GRID_MARGIN + (col * COLUMN_WIDTH)
+            y = GRID_MARGIN + (linha * (BUTTON_HEIGHT + BUTTON_PADDING))
+
+            item = self.button_items.get(slot)
+            if item is None:
+                item = (
+                    self.button_pool.pop()
+                    if self.button_pool
+                    else self._create_button_item()
+                )
+                self.button_items[slot] = item
+            self._update_button_item(item, slot, text_id, x, y, text, resumo, category)
+
+        # O pool não precisa guardar mais widgets do que cabem na área visível
+        capacity = (last_col - first_col + 1) * BUTTONS_PER_COLUMN
+        while (
+            self.button_pool
+            and len(self.button_pool) + len(self.button_items) > capacity
+        ):
+            self._destroy_button_item(self.button_pool.pop())
+
+    def _schedule_grid_render(self):
+        """Agrupa vários pedidos de redesenho (rolagem, redimensionamento) em um só."""
+        if self.grid_render_job is None:
+            self.grid_render_job = self.root.after_idle(self._render_visible_buttons)
+
+    def _on_grid_xscroll(self, first, last):
+        """Chamado pelo canvas quando a área visível muda: atualiza a barra e as células."""
+        self.grid_scrollbar.set(first, last)
+        # Mantém a imagem de fundo parada enquanto os botões rolam
+        if self.bg_item is not None:
+            self.canvas.coords(self.bg_item, self.canvas.canvasx(0), 0)
+        self._schedule_grid_render()
+
+    def _on_canvas_configure(self, event=None):
+        self._update_grid_scrollbar()
+        self._schedule_grid_render()
+        self._schedule_bg_resize()
+
+    def _update_grid_scrollbar(self):
+        """Exibe a barra de rolagem somente quando as colunas não cabem no canvas."""
+        canvas_width = self.canvas.winfo_width()
+        if canvas_width <= 1 or self.grid_scrollregion is None:
+            return  # Canvas ainda não foi exibido
+        needed = self.grid_scrollregion[2] > canvas_width
+        if needed and not self.grid_scrollbar.winfo_ismapped():
+            self.grid_scrollbar.pack(fill="x", after=self.canvas)
+        elif not needed and self.grid_scrollbar.winfo_ismapped():
+            self.grid_scrollbar.pack_forget()
+
+    def _bind_grid_mousewheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_grid_mousewheel)
+        widget.bind("<Button-4>", self._on_grid_mousewheel)
+        widget.bind("<Button-5>", self._on_grid_mousewheel)
+
+    def _on_grid_mousewheel(self, event):
+        """Rola a grade de botões horizontalmente, uma coluna por passo da roda do mouse."""
+        if event.num == 4 or (event.num != 5 and event.delta > 0):
+            self.canvas.xview_scroll(-1, "units")
+        else:
+            self.canvas.xview_scroll(1, "units")
+        return "break"
+
+    def _create_button_item(self):
+        """Cria um widget de botão reutilizável para uma célula da grade."""
+        btn = ttk.Button(self.canvas)
+        window = self.canvas.create_window(
+            0, 0, anchor="nw", window=btn, width=BUTTON_WIDTH, height=BUTTON_HEIGHT
+        )
+        item = {
+            "btn": btn,
+            "window": window,
+            "tooltip": Tooltip(btn, ""),
+            "edit_btn": None,
+            "edit_window": None,
+            "hidden": False,
+            "key": None,
+            "slot": None,
+            "pos": None,
+            "text": None,
+            "label": None,
+        }
+        # --- Drag-and-drop bindings (só têm efeito com o modo de arrastar ativo) ---
+        btn.bind("<ButtonPress-1>", lambda e, it=item: self._on_drag_start(e, it))
+        btn.bind("<B1-Motion>", self._on_drag_motion)
+        btn.bind("<ButtonRelease-1>", lambda e, it=item: self._on_drag_release(e, it))
+        self._bind_grid_mousewheel(btn)
+        return item
+
+    def _update_button_item(self, item, slot, key, x, y, text, resumo, category):
+        """Aplica ao widget apenas as diferenças entre o estado atual e o desejado."""
+        item["slot"] = slot
+        item["key"] = key
+        if item["hidden"]:
+            self.canvas.itemconfigure(item["window"], state="normal")
+            if item["edit_window"] is not None:
+                self.canvas.itemconfigure(item["edit_window"], state="normal")
+            item["hidden"] = False
+        if item["pos"] != (x, y):
+            self.canvas.coords(item["window"], x, y)
+            if item["edit_window"] is not None:
+                self.canvas.coords(item["edit_window"], x + BUTTON_WIDTH + 5, y)
+            item["pos"] = (x, y)
+        if item["label"] != resumo:
+            item["btn"].configure(text=resumo)
+            item["label"] = resumo
+        if item["text"] != text:
+            item["btn"].configure(command=lambda t=text: self.copy_to_clipboard(t))
+            item["text"] = text
+        item["tooltip"].text = f"Categoria: {category}"
+
+        # Botão de edição
+        if self.config["show_edit_buttons"] and item["edit_btn"] is None:
+            item["edit_btn"] = ttk.Button(
                 self.canvas,
-                text=resumo,
-                command=lambda t=text: self.copy_to_clipboard(t),
+                text="✎",
+                width=2,
+                command=lambda it=item: self.open_edit_window(it["key"]),
             )
-            btn_window = self.canvas.create_window(
-                x, y, anchor="nw", window=btn, width=button_width, height=button_height
+            self._bind_grid_mousewheel(item["edit_btn"])
+            item["edit_window"] = self.canvas.create_window(
+                x + BUTTON_WIDTH + 5,
+                y,
+                anchor="nw",
+                window=item["edit_btn"],
+                width=25,
+                height=BUTTON_HEIGHT,
             )
-            self.button_windows.append(btn_window)
-            Tooltip(btn, f"Categoria: {category}")
-            # --- Drag-and-drop bindings ---
-            if self.drag_mode:
-                # Only allow drag for main buttons (not edit buttons)
-                btn.bind(
-                    "<ButtonPress-1>",
-                    lambda e, i=idx: self._on_drag_start(e, i, filtered_indices),
-                )
-                btn.bind("<B1-Motion>", self._on_drag_motion)
-                btn.bind(
-                    "<ButtonRelease-1>",
-                    lambda e, i=idx: self._on_drag_release(e, i, filtered_indices),
-                )
-            # Botão de edição
-            if self.config["show_edit_buttons"]:
-                edit_btn = ttk.Button(
-                    self.canvas,
-                    text="✎",
-                    width=2,
-                    command=lambda i=self.texts.index(text_item): self.open_edit_window(
-                        i
-                    ),
-                )
-                edit_window = self.canvas.create_window(
-                    x + button_width + 5,
-                    y,
-                    anchor="nw",
-                    window=edit_btn,
-                    width=25,
-                    height=button_height,
-                )
-                self.button_windows.append(edit_window)
-        total_colunas = min(len(filtered_texts) // bots_por_coluna + 1, max_colunas)
-        total_width = start_x + (total_colunas * 185)
-        total_height = start_y + (bots_por_coluna * (button_height + padding))
-        self.canvas.config(scrollregion=(0, 0, total_width, total_height))
+        elif not self.config["show_edit_buttons"] and item["edit_btn"] is not None:
+            self.canvas.delete(item["edit_window"])
+            item["edit_btn"].destroy()
+            item["edit_btn"] = item["edit_window"] = None
+
+    def _hide_button_item(self, item):
+        """Oculta um widget que voltou ao pool, sem destruí-lo."""
+        item["tooltip"].hidetip()
+        self.canvas.itemconfigure(item["window"], state="hidden")
+        if item["edit_window"] is not None:
+            self.canvas.itemconfigure(item["edit_window"], state="hidden")
+        item["hidden"] = True
+        item["slot"] = None
+
+    def _destroy_button_item(self, item):
+        """Remove do canvas o botão de um texto e seu botão de edição."""
+        item["tooltip"].hidetip()
+        self.canvas.delete(item["window"])
+        item["btn"].destroy()
+        if item["edit_btn"] is not None:
+            self.canvas.delete(item["edit_window"])
+            item["edit_btn"].destroy()
+
+    def refresh_buttons(self):
+        """Atualiza somente a grade de botões, sem recriar menus, fundo ou bloco de notas."""
+        self.create_buttons()
 
     # --- Drag-and-drop handlers ---
-    def _on_drag_start(self, event, idx, filtered_indices):
+    def _on_drag_start(self, event, item):
+        # Com uma busca ativa a ordem exibida é a de relevância, então não se reordena
+        if not self.drag_mode or item["slot"] is None or self.search_query.strip():
+            return
         widget = event.widget
         self._drag_data["widget"] = widget
-        self._drag_data["start_idx"] = idx
-        self._drag_data["filtered_indices"] = filtered_indices
+        self._drag_data["start_idx"] = item["slot"]
         # Visual feedback: lift the button
         widget.lift()
 
@@ -776,59 +3410,52 @@ class SupportApp:
             # Optionally, show a floating label or highlight
             pass  # Visual feedback can be added here
 
-    def _on_drag_release(self, event, idx, filtered_indices):
+    def _on_drag_release(self, event, item):
         widget = self._drag_data["widget"]
         start_idx = self._drag_data["start_idx"]
-        if widget is None or start_idx is None:
+        if not self.drag_mode or widget is None or start_idx is None:
             return
-        # Calculate new index based on mouse position
-        x = event.x_root - self.root.winfo_rootx()
-        y = event.y_root - self.root.winfo_rooty()
+        filtered_ids = self.filtered_ids
+        # Calculate new index based on mouse position (em coordenadas do canvas)
+        x = self.canvas.canvasx(event.x_root - self.canvas.winfo_rootx())
+        y = self.canvas.canvasy(event.y_root - self.canvas.winfo_rooty())
         # Find which button position is closest
-        start_x, start_y = 10, 10
-        button_width = 150
-        button_height = 30
-        padding = 5
-        max_colunas = 8
-        bots_por_coluna = 10
-        col = max(0, min((x - start_x) // 185, max_colunas - 1))
+        col = max(0, (x - GRID_MARGIN) // COLUMN_WIDTH)
         linha = max(
-            0, min((y - start_y) // (button_height + padding), bots_por_coluna - 1)
+            0,
+            min(
+                (y - GRID_MARGIN) // (BUTTON_HEIGHT + BUTTON_PADDING),
+                BUTTONS_PER_COLUMN - 1,
+            ),
         )
-        new_idx = int(col * bots_por_coluna + linha)
-        filtered_len = len(filtered_indices)
+        new_idx = int(col * BUTTONS_PER_COLUMN + linha)
+        filtered_len = len(filtered_ids)
         if new_idx >= filtered_len:
             new_idx = filtered_len - 1
         # Only reorder if position changed
         if new_idx != start_idx:
-            orig_idx = filtered_indices[start_idx]
-            # Remove and insert in self.texts
-            item = self.texts.pop(orig_idx)
-            # If moving down, adjust for pop
-            if new_idx > start_idx:
-                insert_at = filtered_indices[new_idx]
-            else:
-                insert_at = filtered_indices[new_idx]
-            self.texts.insert(insert_at, item)
-            self.text_manager.save_texts()
-        self.refresh_gui()
+            # Move o texto para a posição (em self.texts) do botão de destino
+            self.text_manager.move_text(
+                filtered_ids[start_idx],
+                self.text_manager.index_of(filtered_ids[new_idx]),
+            )
         self._drag_data = {"widget": None, "start_idx": None, "drag_window": None}
+        self.refresh_buttons()
 
     def copy_to_clipboard(self, text):
         self.root.clipboard_clear()
         self.root.clipboard_append(text)
 
-        # Reproduz som apenas se o sistema de áudio estiver disponível
-        if self.config["sound_enabled"] and self.audio_available and self.click_sound:
-            try:
-                pygame.mixer.find_channel(True).play(self.click_sound)
-            except Exception as e:
-                print(f"Erro ao reproduzir som: {e}")
-                self.audio_available = (
-                    False  # Desativa o áudio se ocorrer erro durante a reprodução
-                )
+        # O som toca na thread do reprodutor; a cópia nunca espera pelo dispositivo de áudio
+        if self.config["sound_enabled"] and self._ensure_audio():
+            self.audio_player.play()
+
+    def open_edit_window(self, text_id):
+        try:
+            text, label, current_category = self.text_manager.get_text(text_id)
+        except KeyError:
+            return  # O texto foi removido enquanto o botão ainda estava na tela
 
-    def open_edit_window(self, idx):
         edit_window = tk.Toplevel(self.root)
         edit_window.title("Editar Texto e Nome do Botão")
 
@@ -836,7 +3463,7 @@ class SupportApp:
         tk.Label(edit_window, text="Nome do Botão:").pack(padx=10, pady=(10, 0))
         name_entry = tk.Entry(edit_window, width=50)
         name_entry.pack(padx=10, pady=(0, 10))
-        name_entry.insert(tk.END, self.texts[idx][1])
+        name_entry.insert(tk.END, label)
 
         # Campo para editar o texto do botão
         tk.Label(edit_window, text="Texto do Botão:").pack(padx=10, pady=(10, 0))
@@ -844,14 +3471,13 @@ class SupportApp:
             edit_window, wrap=tk.WORD, width=50, height=15
         )
         text_box.pack(padx=10, pady=(0, 10))
-        text_box.insert(tk.END, self.texts[idx][0])
+        text_box.insert(tk.END, text)
 
         # Campo para selecionar a categoria
         tk.Label(edit_window, text="Categoria:").pack(padx=10, pady=(10, 0))
         category_var = tk.StringVar(edit_window)
 
-        # Obtém a categoria atual do botão ou usa 'Geral' como padrão
-        current_category = self.texts[idx][2] if len(self.texts[idx]) >= 3 else "Geral"
+        # Categoria atual do botão ('Geral' para textos no formato antigo)
         category_var.set(current_category)
 
         category_dropdown = ttk.Combobox(
@@ -880,14 +3506,22 @@ class SupportApp:
         button_frame = tk.Frame(edit_window)
         button_frame.pack(pady=10)
 
+        def text_still_exists():
+            if text_id in self.text_manager.positions:
+                return True
+            messagebox.showerror("Erro", "Este botão foi removido em outra janela.")
+            edit_window.destroy()
+            return False
+
         def save_text():
             new_text = text_box.get("1.0", tk.END).strip()
             new_name = name_entry.get()
-            if new_name and new_text:
-                self.texts[idx] = (new_text, new_name, category_var.get())
-                self.text_manager.save_texts()
+            if new_name and new_text and text_still_exists():
+                self.text_manager.update_text(
+                    text_id, new_text, new_name, category_var.get()
+                )
                 self.update_category_menu()
-                self.refresh_gui()
+                self.refresh_buttons()
                 edit_window.destroy()
 
         # Botão Salvar
@@ -897,12 +3531,15 @@ class SupportApp:
 
         # Botão Deletar
         def delete_button():
-            if messagebox.askyesno(
-                "Confirmar", "Tem certeza que deseja deletar este botão?"
+            if (
+                messagebox.askyesno(
+                    "Confirmar", "Tem certeza que deseja deletar este botão?"
+                )
+                and text_still_exists()
             ):
-                del self.texts[idx]
-                self.text_manager.save_texts()
-                self.refresh_gui()
+                self.text_manager.delete_text(text_id)
+                self.update_category_menu()
+                self.refresh_buttons()
                 edit_window.destroy()
 
         ttk.Button(button_frame, text="Deletar Botão", command=delete_button).pack(
@@ -970,10 +3607,9 @@ class SupportApp:
                 return
 
             # Adiciona o texto com a categoria selecionada
-            self.texts.append((new_text, new_name, category_var.get()))
-            self.text_manager.save_texts()
+            self.text_manager.add_text(new_text, new_name, category_var.get())
             self.update_category_menu()
-            self.refresh_gui()
+            self.refresh_buttons()
             add_window.destroy()
 
         ttk.Button(add_window, text="Adicionar", command=confirm_add).pack(pady=10)
@@ -1059,9 +3695,33 @@ class SupportApp:
         menu_bar.add_cascade(label="│", state="disabled")
 
         # Menu "Ajuda" - Movido para o final
-        help_menu = tk.Menu(menu_bar, tearoff=0)
-        menu_bar.add_cascade(label="Ajuda", menu=help_menu)
-        help_menu.add_command(label="Sobre", command=self.show_about)
+        self.help_menu = tk.Menu(menu_bar, tearoff=0)
+        menu_bar.add_cascade(label="Ajuda", menu=self.help_menu)
+        self.help_menu.add_command(
+            label="Verificar Atualizações",
+            command=lambda: self.check_updates(manual=True),
+        )
+        self.help_menu.add_command(
+            label=(
+                "Desativar Modo Offline"
+                if self.config.get("offline_mode")
+                else "Ativar Modo Offline"
+            ),
+            command=self.toggle_offline_mode,
+        )
+        self.help_menu.add_command(
+            label=(
+                "Desativar Canal Beta"
+                if self.config.get("update_channel") == "beta"
+                else "Ativar Canal Beta"
+            ),
+            command=self.toggle_update_channel,
+        )
+        self.help_menu.add_command(
+            label="Desempenho", command=self.show_performance_report
+        )
+        self.help_menu.add_separator()
+        self.help_menu.add_command(label="Sobre", command=self.show_about)
 
     def update_category_menu(self):
         """Atualiza o menu de categorias com as categorias disponíveis."""
@@ -1071,9 +3731,9 @@ class SupportApp:
             for i in range(items, 2, -1):
                 self.category_menu.delete(i)
 
-        # Adiciona todas as categorias
+        # Adiciona todas as categorias, com a quantidade de textos de cada uma
         self.category_menu.add_radiobutton(
-            label="Todas",
+            label=f"Todas ({len(self.texts)})",
             variable=tk.StringVar(value=self.current_category),
             value="Todas",
             command=lambda: self.filter_by_category("Todas"),
@@ -1082,7 +3742,7 @@ class SupportApp:
         # Adiciona cada categoria como radiobutton
         for category in self.text_manager.categories:
             self.category_menu.add_radiobutton(
-                label=category,
+                label=f"{category} ({self.text_manager.category_count(category)})",
                 variable=tk.StringVar(value=self.current_category),
                 value=category,
                 command=lambda c=category: self.filter_by_category(c),
@@ -1091,7 +3751,7 @@ class SupportApp:
     def filter_by_category(self, category):
         """Filtra os botões pela categoria selecionada."""
         self.current_category = category
-        self.refresh_gui()
+        self.refresh_buttons()
 
     def add_category(self):
         """Abre uma janela para adicionar nova categoria."""
@@ -1153,8 +3813,13 @@ class SupportApp:
                         for category in self.text_manager.categories:
                             categories_listbox.insert(tk.END, category)
 
-                        # Atualiza o menu de categorias
+                        # Mantém o filtro atual se a categoria exibida foi renomeada
+                        if self.current_category == old_name:
+                            self.current_category = new_name.strip()
+
+                        # Atualiza o menu de categorias e os botões
                         self.update_category_menu()
+                        self.refresh_buttons()
                         messagebox.showinfo(
                             "Sucesso", f"Categoria renomeada para '{new_name}'!"
                         )
@@ -1190,7 +3855,7 @@ class SupportApp:
                         # Se a categoria atual for a excluída, muda para 'Todas'
                         if self.current_category == name:
                             self.current_category = "Todas"
-                            self.refresh_gui()
+                        self.refresh_buttons()
 
                         messagebox.showinfo("Sucesso", f"Categoria '{name}' excluída!")
                     else:
@@ -1237,6 +3902,8 @@ class SupportApp:
             )
             return
 
+        import subprocess
+
         # Define o creationflags para não abrir janela de CMD no Windows
         creationflags = 0
         if os.name == "nt":
@@ -1285,6 +3952,10 @@ class SupportApp:
 
     def toggle_sound(self):
         self.config["sound_enabled"] = not self.config["sound_enabled"]
+        if self.config["sound_enabled"] and self.audio_player is not None:
+            # Tenta o áudio de novo caso tenha falhado antes, encerrando a thread do reprodutor antigo
+            self.audio_player.close()
+            self.audio_player = None
         self.sound_menu.entryconfig(
             0,
             label=(
@@ -1293,7 +3964,7 @@ class SupportApp:
                 else "Ativar Som de Clique"
             ),
         )
-        self.config_manager.save_config()
+        self.config_manager.schedule_save()
 
     def toggle_edit_buttons(self):
         self.config["show_edit_buttons"] = not self.config["show_edit_buttons"]
@@ -1305,8 +3976,8 @@ class SupportApp:
                 else "Exibir Botões de Edição"
             ),
         )
-        self.config_manager.save_config()
-        self.refresh_gui()
+        self.config_manager.schedule_save()
+        self.refresh_buttons()
 
     def toggle_notepad(self, no_save=False):
         """
@@ -1348,7 +4019,51 @@ class SupportApp:
         )
 
         if not no_save:
-            self.config_manager.save_config()
+            self.config_manager.schedule_save()
+
+    def report_startup(self):
+        """Encerra a medição da inicialização e registra o relatório no console e no log."""
+        perf_monitor.finish_startup()
+        print(perf_monitor.report())
+        perf_monitor.write_log(self.performance_log_path)
+
+    def show_performance_report(self):
+        """Exibe as medições de desempenho (inicialização e operações) em uma janela."""
+        window = tk.Toplevel(self.root)
+        window.title("Desempenho")
+        window.geometry("520x420")
+
+        report_text = scrolledtext.ScrolledText(
+            window, wrap=tk.NONE, font=("Courier New", 9)
+        )
+        report_text.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        def show_report():
+            report_text.configure(state="normal")
+            report_text.delete("1.0", tk.END)
+            report_text.insert(tk.END, perf_monitor.report())
+            report_text.configure(state="disabled")
+
+        def save_report():
+            perf_monitor.write_log(self.performance_log_path)
+            messagebox.showinfo(
+                "Desempenho",
+                f"Relatório gravado em {self.performance_log_path}",
+                parent=window,
+            )
+
+        btn_frame = tk.Frame(window)
+        btn_frame.pack(pady=(0, 10))
+        ttk.Button(btn_frame, text="Atualizar", command=show_report).pack(
+            side="left", padx=5
+        )
+        ttk.Button(btn_frame, text="Salvar no Log", command=save_report).pack(
+            side="left", padx=5
+        )
+        ttk.Button(btn_frame, text="Fechar", command=window.destroy).pack(
+            side="left", padx=5
+        )
+        show_report()
 
     def show_about(self):
         """
@@ -1529,10 +4244,10 @@ class SupportApp:
         self.root.geometry(f"{width}x{new_height}+{x}+{y}")
 
     def change_bg_image(self):
-        file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.png")])
+        file_path = filedialog.askopenfilename(filetypes=self._bg_filetypes())
         if file_path:
             self.config["bg_image_path"] = file_path
-            self.config_manager.save_config()
+            self.config_manager.schedule_save()
             self.refresh_gui()
 
     def edit_colors(self):
@@ -1597,7 +4312,7 @@ class SupportApp:
 
             if self.is_valid_color(new_bg_color):
                 self.config["bg_color"] = new_bg_color
-                self.config_manager.save_config()
+                self.config_manager.schedule_save()
                 self.update_button_styles()  # Adicione esta linha
                 self.refresh_gui()
                 edit_window.destroy()
@@ -1724,11 +4439,18 @@ class SupportApp:
 
         # Carrega o conteúdo do bloco de notas
         if not hasattr(self, "notepad_initialized"):
-            text, tags = self.notepad_manager.load_notepad()
-            self.notepad_text.insert(tk.END, text)
-            for tag in tags:
-                self.notepad_text.tag_add(tag["tag"], tag["start"], tag["end"])
+            with perf_monitor.phase("NotepadManager.load_notepad"):
+                text, tags = self.notepad_manager.load_notepad()
+            with perf_monitor.phase("notepad restore"):
+                self.notepad_text.insert(tk.END, text)
+                for tag in tags:
+                    self.notepad_text.tag_add(tag["tag"], tag["start"], tag["end"])
             self.notepad_initialized = True
+            # O conteúdo carregado é o ponto de partida do histórico
+            self.undo_history.reset(
+                self.notepad_text.get("1.0", tk.END), self._capture_tags()
+            )
+            self.notepad_text.edit_modified(False)
 
         if not self.config["notepad_expanded"]:
             self.notepad_frame.pack_forget()
@@ -1736,6 +4458,8 @@ class SupportApp:
         # Vincula eventos de teclado
         self.notepad_text.bind("<Control-z>", self.undo)
         self.notepad_text.bind("<Control-Z>", self.undo)
+        self.notepad_text.bind("<Control-y>", self.redo)
+        self.notepad_text.bind("<Control-Y>", self.redo)
         self.notepad_text.bind("<Control-s>", lambda e: self.save_notepad())
         self.notepad_text.bind("<Control-S>", lambda e: self.save_notepad())
 
@@ -1768,6 +4492,9 @@ class SupportApp:
                 # Depois aplica a nova tag
                 self.notepad_text.tag_add(tag_name, sel_start, sel_end)
 
+            # Formatação não altera o texto, mas precisa entrar no próximo salvamento
+            self.notepad_text.edit_modified(True)
+
         except tk.TclError:
             # Não há texto selecionado, não faz nada
             pass
@@ -1789,10 +4516,8 @@ class SupportApp:
         text = self.notepad_text.get("1.0", tk.END)
         tags = self._capture_tags()
 
-        # Adiciona o estado à pilha de undo
-        if self.undo_stack and self.undo_stack[-1] == (text, tags):
-            return  # Evita salvar estados duplicados
-        self.undo_stack.append((text, tags))
+        # Registra apenas a diferença em relação ao último estado
+        self.undo_history.record(text, tags)
 
     def _capture_tags(self):
         """Captura todas as tags aplicadas no texto."""
@@ -1814,16 +4539,28 @@ class SupportApp:
 
     def undo(self, event=None):
         """Desfaz a última ação."""
-        if not self.undo_stack:
-            return  # Nada para desfazer
-
-        # Restaura o estado anterior
-        text, tags = self.undo_stack.pop()
-        self._restore_state(text, tags)
+        state = self.undo_history.undo(
+            self.notepad_text.get("1.0", tk.END), self._capture_tags()
+        )
+        if state:
+            self._restore_state(*state)
+        return "break"
+
+    def redo(self, event=None):
+        """Refaz a última ação desfeita."""
+        state = self.undo_history.redo(
+            self.notepad_text.get("1.0", tk.END), self._capture_tags()
+        )
+        if state:
+            self._restore_state(*state)
+        return "break"
 
     def _restore_state(self, text, tags):
         """Restaura o texto e as tags no bloco de notas."""
         self.notepad_text.delete("1.0", tk.END)  # Limpa o conteúdo atual
+        # O Text sempre mantém uma quebra de linha final própria; não a duplica
+        if text.endswith("\n"):
+            text = text[:-1]
         self.notepad_text.insert(tk.END, text)  # Insere o conteúdo salvo
 
         # Remove todas as tags existentes
@@ -1835,6 +4572,7 @@ class SupportApp:
         for tag in tags:
             self.notepad_text.tag_add(tag["tag"], tag["start"], tag["end"])
 
+    @perf_monitor.timed("notepad restore")
     def _restore_notepad_content(self, text, tags):
         """Restaura o conteúdo e as tags do bloco de notas (usado no refresh_gui)."""
         if not hasattr(self, "notepad_text"):
@@ -1863,7 +4601,24 @@ class SupportApp:
                     end = ranges[i + 1]
                     tags.append({"tag": tag, "start": str(start), "end": str(end)})
         self.notepad_manager.save_notepad(content, tags)
+        self.notepad_text.edit_modified(False)
+
+    def _schedule_notepad_autosave(self):
+        """Agenda o próximo salvamento automático do bloco de notas, se estiver ativado."""
+        interval = self.config.get("notepad_autosave_seconds", NOTEPAD_AUTOSAVE_SECONDS)
+        if interval and interval > 0:
+            self.root.after(int(interval * 1000), self._autosave_notepad)
 
+    def _autosave_notepad(self):
+        """Salva o bloco de notas se houve alterações desde o último salvamento."""
+        try:
+            if hasattr(self, "notepad_text") and self.notepad_text.edit_modified():
+                self.save_notepad()
+        except (OSError, tk.TclError) as e:
+            print(f"Erro no salvamento automático do bloco de notas: {e}")
+        self._schedule_notepad_autosave()
+
+    @perf_monitor.timed("refresh_gui")
     def refresh_gui(self):
         """Atualiza toda a interface com as novas configurações"""
         # Captura estado atual
@@ -1958,7 +4713,313 @@ class SupportApp:
                 else "Desativar arrastar botões"
             ),
         )
-        self.refresh_gui()
+        self.refresh_buttons()
+
+
+class SnakeRenderer:
+    """
+    Desenho da cobra em modo retido: cada segmento tem um conjunto fixo de itens no canvas.
+    A cada passo, o item da cauda é reposicionado como nova cabeça (coords/tag_raise) em vez
+    de apagar e recriar a cobra inteira, então o custo por quadro não depende do comprimento.
+
+    Parâmetros:
+        canvas (tk.Canvas): Canvas do jogo.
+        cell_size (int): Tamanho de cada célula em pixels.
+    """
+
+    TAG = "snake"
+    SPARKLE_ITEMS = 4  # Brilhos reaproveitados no modo invencível
+    # (corpo, reflexo, sombra/escamas) para o estado normal e o invencível
+    PALETTES = {
+        False: ("#00CC00", "#80FF80", "#006600"),
+        True: ("#FFD700", "#FFFFA0", "#B8860B"),
+    }
+
+    def __init__(self, canvas, cell_size):
+        self.canvas = canvas
+        self.cell_size = cell_size
+        self.reset()
+
+    def reset(self):
+        """Descarta os itens da cobra (ex.: após canvas.delete("all"))."""
+        self.canvas.delete(self.TAG)
+        self.segments = collections.deque()
+        self.eyes = []
+        self.sparkles = []
+        self.moves = 0
+        self.placed = 0
+        self.invincible = False
+
+    def _create_segment(self):
+        """Cria os itens de um segmento (sombra, corpo, reflexo e escamas)."""
+        base, glow, shadow = self.PALETTES[self.invincible]
+        canvas = self.canvas
+        return {
+            "shadow": canvas.create_rectangle(
+                0, 0, 0, 0, fill="#222222", outline="", tags=self.TAG
+            ),
+            "body": canvas.create_rectangle(
+                0,
+                0,
+                0,
+                0,
+                fill=base,
+                outline=shadow,
+                width=1,
+                tags=(self.TAG, "snake_body"),
+            ),
+            "glow": canvas.create_polygon(
+                0, 0, 0, 0, 0, 0, fill=glow, outline="", tags=(self.TAG, "snake_glow")
+            ),
+            "scales": [
+                canvas.create_line(
+                    0, 0, 0, 0, fill=shadow, width=1, tags=(self.TAG, "snake_scale")
+                )
+                for _ in range(4)
+            ],
+        }
+
+    def _place_segment(self, segment, x, y):
+        """Move o segmento para a célula (x, y) e o coloca acima dos demais."""
+        size = self.cell_size
+        offset = 3
+        canvas = self.canvas
+        canvas.coords(
+            segment["shadow"],
+            x + offset,
+            y + offset,
+            x + size + offset,
+            y + size + offset,
+        )
+        canvas.coords(segment["body"], x, y, x + size, y + size)
+        canvas.coords(segment["glow"], x, y, x + 6, y, x, y + 6)
+        canvas.itemconfigure(segment["glow"], state="normal")
+        # Alterna o padrão das escamas entre segmentos consecutivos
+        vertical = self.placed % 2 == 0
+        self.placed += 1
+        step = size // 4
+        for j, line in enumerate(segment["scales"]):
+            if vertical:
+                canvas.coords(line, x + step * j, y, x + step * j, y + size)
+            else:
+                canvas.coords(line, x, y + step * j, x + size, y + step * j)
+
+        canvas.tag_raise(segment["shadow"])
+        canvas.tag_raise(segment["body"])
+        canvas.tag_raise(segment["glow"])
+        for line in segment["scales"]:
+            canvas.tag_raise(line)
+
+    def _draw_head(self, x, y, direction):
+        """Posiciona os olhos e o reflexo da cabeça conforme a direção."""
+        canvas = self.canvas
+        if not self.eyes:
+            for _ in range(2):
+                # Contorno branco do olho e pupila
+                self.eyes.append(
+                    (
+                        canvas.create_oval(
+                            0,
+                            0,
+                            0,
+                            0,
+                            fill="white",
+                            outline="black",
+                            width=1,
+                            tags=self.TAG,
+                        ),
+                        canvas.create_oval(
+                            0, 0, 0, 0, fill="black", outline="", tags=self.TAG
+                        ),
+                    )
+                )
+
+        if direction == "right":
+            positions = [(x + 15, y + 5), (x + 15, y + 15)]
+        elif direction == "left":
+            positions = [(x + 5, y + 5), (x + 5, y + 15)]
+        elif direction == "up":
+            positions = [(x + 5, y + 5), (x + 15, y + 5)]
+        else:  # down
+            positions = [(x + 5, y + 15), (x + 15, y + 15)]
+
+        for (eye, pupil), (ex, ey) in zip(self.eyes, positions):
+            canvas.coords(eye, ex - 3, ey - 3, ex + 3, ey + 3)
+            canvas.coords(pupil, ex - 1, ey - 1, ex + 1, ey + 1)
+            canvas.tag_raise(eye)
+            canvas.tag_raise(pupil)
+
+        # Reflexo superior-esquerdo da cabeça só aparece em algumas direções
+        canvas.itemconfigure(
+            self.segments[-1]["glow"],
+            state="normal" if direction in ("down", "right") else "hidden",
+        )
+
+    def _set_invincible(self, invincible):
+        """Recolore todos os segmentos de uma vez, pelas tags."""
+        self.invincible = invincible
+        base, glow, shadow = self.PALETTES[invincible]
+        self.canvas.itemconfigure("snake_body", fill=base, outline=shadow)
+        self.canvas.itemconfigure("snake_glow", fill=glow)
+        self.canvas.itemconfigure("snake_scale", fill=shadow)
+
+    def _draw_sparkles(self, snake):
+        """Brilhos do modo invencível em segmentos aleatórios, com itens reaproveitados."""
+        if not self.sparkles:
+            if not self.invincible:
+                return
+            self.sparkles = [
+                self.canvas.create_text(
+                    0, 0, text="✦", fill="white", font=("Arial", 8), tags=self.TAG
+                )
+                for _ in range(self.SPARKLE_ITEMS)
+            ]
+
+        for sparkle in self.sparkles:
+            if not self.invincible or random.random() <= 0.7:
+                self.canvas.itemconfigure(sparkle, state="hidden")
+                continue
+            x, y = snake[random.randrange(len(snake))]
+            self.canvas.coords(
+                sparkle, x + random.randint(5, 15), y + random.randint(5, 15)
+            )
+            self.canvas.itemconfigure(sparkle, state="normal")
+            self.canvas.tag_raise(sparkle)
+
+    def render(self, snake, moves, direction, invincible):
+        """
+        Atualiza o desenho da cobra.
+
+        Parâmetros:
+            snake (sequence): Células (x, y) da cauda até a cabeça.
+            moves (int): Total de passos dados pela cabeça desde o início da partida.
+            direction (str): Direção atual da cobra.
+            invincible (bool): Se o powerup de invencibilidade está ativo.
+        """
+        if not snake:
+            return
+        if invincible != self.invincible:
+            self._set_invincible(invincible)
+
+        # Células novas na cabeça desde o último desenho (mais de uma se quadros foram pulados)
+        length = len(snake)
+        new_cells = min(length, max(moves - self.moves, length - len(self.segments)))
+        self.moves = moves
+
+        if new_cells and self.segments:
+            # A cabeça anterior passa a fazer parte do corpo e volta a exibir o reflexo
+            self.canvas.itemconfigure(self.segments[-1]["glow"], state="normal")
+
+        # Reaproveita os segmentos da cauda que saíram da cobra; só cria itens quando ela cresce
+        recycle = min(new_cells, max(0, len(self.segments) + new_cells - length))
+        for index in range(-new_cells, 0):
+            if recycle:
+                segment = self.segments.popleft()
+                recycle -= 1
+            else:
+                segment = self._create_segment()
+            self._place_segment(segment, *snake[index])
+            self.segments.append(segment)
+
+        while len(self.segments) > length:
+            segment = self.segments.popleft()
+            for key in ("shadow", "body", "glow"):
+                self.canvas.delete(segment[key])
+            for line in segment["scales"]:
+                self.canvas.delete(line)
+
+        self._draw_head(*snake[-1], direction)
+        self._draw_sparkles(snake)
+
+
+class ParticlePool:
+    """
+    Efeitos de partículas (brilhos e rastros dos powerups) com um número fixo de itens no canvas.
+    Os itens são criados sob demanda até o limite de cada tipo e depois reaproveitados (o mais
+    antigo primeiro); cores e expiração avançam em advance(), chamado pelo laço do jogo,
+    sem um after por partícula.
+
+    Parâmetros:
+        canvas (tk.Canvas): Canvas do jogo.
+    """
+
+    TAG = "effect"
+    # Limite de itens, duração (s) e cores por idade (s) de cada tipo de partícula
+    KINDS = {
+        "sparkle": {"count": 8, "lifetime": 0.3, "stages": ((0.0, "#FFD700"),)},
+        "trail": {
+            "count": 8,
+            "lifetime": 0.2,
+            "stages": ((0.0, "#87CEFA"), (0.1, "#ADD8E6")),
+        },
+    }
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.reset()
+
+    def reset(self):
+        """Descarta as partículas (ex.: após canvas.delete("all"))."""
+        self.canvas.delete(self.TAG)
+        self.slots = {kind: [] for kind in self.KINDS}
+        self.next_slot = dict.fromkeys(self.KINDS, 0)
+
+    def _create_item(self, kind):
+        """Cria o item de canvas de uma partícula, inicialmente oculto."""
+        if kind == "sparkle":
+            return self.canvas.create_text(
+                0, 0, text="✦", font=("Arial", 8), state="hidden", tags=self.TAG
+            )
+        return self.canvas.create_oval(
+            0, 0, 0, 0, outline="", state="hidden", tags=self.TAG
+        )
+
+    def spawn(self, kind, *coords):
+        """
+        Exibe uma partícula, reaproveitando o item mais antigo do tipo quando o limite foi atingido.
+
+        Parâmetros:
+            kind (str): Tipo da partícula ("sparkle" ou "trail").
+            coords: Coordenadas do item (x, y para texto; x1, y1, x2, y2 para oval).
+        """
+        settings = self.KINDS[kind]
+        slots = self.slots[kind]
+        if len(slots) < settings["count"]:
+            slot = {"id": self._create_item(kind)}
+            slots.append(slot)
+        else:
+            slot = slots[self.next_slot[kind]]
+            self.next_slot[kind] = (self.next_slot[kind] + 1) % settings["count"]
+
+        slot["born"] = time.perf_counter()
+        slot["stage"] = 0
+        self.canvas.coords(slot["id"], *coords)
+        self.canvas.itemconfigure(
+            slot["id"], fill=settings["stages"][0][1], state="normal"
+        )
+        self.canvas.tag_raise(slot["id"])
+
+    def advance(self):
+        """Atualiza a cor das partículas conforme a idade e oculta as expiradas."""
+        now = time.perf_counter()
+        for kind, slots in self.slots.items():
+            settings = self.KINDS[kind]
+            stages = settings["stages"]
+            for slot in slots:
+                if slot["born"] is None:
+                    continue
+                age = now - slot["born"]
+                if age >= settings["lifetime"]:
+                    self.canvas.itemconfigure(slot["id"], state="hidden")
+                    slot["born"] = None
+                    continue
+
+                stage = slot["stage"]
+                while stage + 1 < len(stages) and stages[stage + 1][0] <= age:
+                    stage += 1
+                if stage != slot["stage"]:
+                    slot["stage"] = stage
+                    self.canvas.itemconfigure(slot["id"], fill=stages[stage][1])
 
 
 class SnakeGame:
@@ -1993,12 +5054,11 @@ class SnakeGame:
         self.canvas.pack(
             fill="both", expand=False
         )  # Removido expand=True para manter tamanho fixo
+        self.renderer = SnakeRenderer(self.canvas, self.cell_size)
+        self.particles = ParticlePool(self.canvas)
 
         # Variáveis de estado do jogo
-        self.snake = [(200, 200), (220, 200), (240, 200)]
-        self.direction = "right"
-        self.direction_queue = []
-        self.apple = self.generate_apple()
+        self.reset_snake()
         self.score = 0
         self.apples_eaten = 0
         self.game_active = False
@@ -2009,6 +5069,20 @@ class SnakeGame:
         self.active_powerup = None
         self.powerup_spawn_time = 0
         self.powerup_cooldown = 15  # Segundos entre powerups
+        # Controle do laço de passo fixo
+        self.tick_job = None
+        self.next_tick = None
+        self.skipped_frames = 0
+        self.frame_times = collections.deque(maxlen=SNAKE_STATS_WINDOW)
+        self.tick_delays = collections.deque(maxlen=SNAKE_STATS_WINDOW)
+        self.apple = self.generate_apple()
+
+        # Campo de estrelas pré-desenhado (por tela) e animação da tela de título
+        self.starfields = {}
+        self.title_stars = []
+        self.stars = []
+        self.star_job = None
+        self.title_visible = False
 
         # Elementos de UI
         self.score_display = tk.Label(
@@ -2026,66 +5100,173 @@ class SnakeGame:
         self.master.bind("<s>", self.down)
         self.master.bind("<d>", self.right)
         self.master.bind("<space>", self.toggle_pause)
+        self.master.bind("<Map>", self.on_map)
 
         # Exibe a tela de título
         self.show_title_screen()
 
+    def reset_snake(self):
+        """
+        Coloca a cobra na posição inicial.
+        A cobra é uma deque (cauda à esquerda, cabeça à direita) e `occupied` conta quantos
+        segmentos ocupam cada célula (no modo invencível a cobra pode se sobrepor), permitindo
+        verificar colisões e células livres em O(1).
+        """
+        self.snake = collections.deque([(200, 200), (220, 200), (240, 200)])
+        self.occupied = collections.Counter(self.snake)
+        self.direction = "right"
+        self.direction_queue = collections.deque()
+        self.moves = 0  # Passos dados pela cabeça (usado pelo desenho retido)
+
+    def random_free_cell(self, exclude=()):
+        """
+        Sorteia uma célula não ocupada pela cobra nem pelas posições em exclude.
+
+        Retorna:
+            tuple | None: Coordenadas (x, y) da célula, ou None se o campo estiver cheio.
+        """
+        columns = self.game_width // self.cell_size
+        rows = self.game_height // self.cell_size
+        # Sorteio com rejeição: cada tentativa custa O(1) e o resultado é uniforme entre as livres
+        for _ in range(SNAKE_FREE_CELL_ATTEMPTS):
+            cell = (
+                random.randrange(columns) * self.cell_size,
+                random.randrange(rows) * self.cell_size,
+            )
+            if cell not in self.occupied and cell not in exclude:
+                return cell
+
+        # Campo quase cheio: sorteia entre as células livres restantes
+        free_cells = [
+            (column * self.cell_size, row * self.cell_size)
+            for column in range(columns)
+            for row in range(rows)
+            if (column * self.cell_size, row * self.cell_size) not in self.occupied
+            and (column * self.cell_size, row * self.cell_size) not in exclude
+        ]
+        return random.choice(free_cells) if free_cells else None
+
     def show_title_screen(self):
         """
         Exibe a tela de título com estrelas animadas, título e botão para iniciar o jogo.
         """
+        self.title_visible = True
         self.create_stars()
         self.draw_title()
         self.create_button()
         self.animate_stars()
 
+    def render_starfield(self, stars):
+        """
+        Desenha as estrelas uma única vez em uma imagem transparente, exibida depois como um
+        único item do canvas (em vez de um oval por estrela).
+
+        Parâmetros:
+            stars (list): Tuplas (x, y, tamanho, brilho, tamanho_do_halo ou 0).
+
+        Retorna:
+            tk.PhotoImage: Imagem com o campo de estrelas.
+        """
+        photo = tk.PhotoImage(width=self.game_width, height=self.game_height)
+
+        def fill(brightness, x1, y1, x2, y2):
+            # Recorta ao tamanho da imagem para que put não a aumente
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(self.game_width, x2), min(self.game_height, y2)
+            if x1 < x2 and y1 < y2:
+                photo.put(self.get_star_color(brightness), to=(x1, y1, x2, y2))
+
+        for x, y, size, brightness, glow_size in stars:
+            if glow_size:
+                # Halo de 1 pixel ao redor das estrelas maiores, com metade do brilho
+                glow_brightness = brightness // 2
+                x1, y1 = x - glow_size // 2, y - glow_size // 2
+                x2, y2 = x + size + glow_size // 2, y + size + glow_size // 2
+                fill(glow_brightness, x1, y1, x2, y1 + 1)
+                fill(glow_brightness, x1, y2 - 1, x2, y2)
+                fill(glow_brightness, x1, y1, x1 + 1, y2)
+                fill(glow_brightness, x2 - 1, y1, x2, y2)
+            fill(brightness, x, y, x + size, y + size)
+        return photo
+
     def create_stars(self):
-        """Cria e posiciona estrelas para a tela de título e armazena suas propriedades para animação."""
+        """
+        Cria as estrelas da tela de título: as fixas ficam em uma imagem gerada uma única vez
+        e apenas um pequeno grupo de itens (SNAKE_TWINKLE_STARS) pisca, sendo reposicionado
+        sobre estrelas sorteadas a cada piscada.
+        """
+        if "title" not in self.starfields:
+            self.title_stars = []
+            for _ in range(100):
+                while True:
+                    x = random.randint(0, 400)
+                    y = random.randint(0, 420)
+                    if not (100 <= y <= 150 and 150 <= x <= 250) and not (
+                        300 <= y <= 350 and 150 <= x <= 250
+                    ):
+                        break
+
+                size = random.choice([1, 1, 1, 2, 2, 3])
+                brightness = random.choice([50, 100, 150])
+                self.title_stars.append((x, y, size, brightness, 0))
+            self.starfields["title"] = self.render_starfield(self.title_stars)
+
+        # A imagem vem antes das estrelas que piscam: o lower mantém a ordem entre os
+        # itens do grupo, deixando-as acima dos pixels opacos do fundo
+        self.canvas.create_image(
+            0, 0, image=self.starfields["title"], anchor="nw", tags="title_stars"
+        )
         self.stars = []
-        for _ in range(100):
-            while True:
-                x = random.randint(0, 400)
-                y = random.randint(0, 420)
-                if not (100 <= y <= 150 and 150 <= x <= 250) and not (
-                    300 <= y <= 350 and 150 <= x <= 250
-                ):
-                    break
-
-            size = random.choice([1, 1, 1, 2, 2, 3])
+        for _ in range(SNAKE_TWINKLE_STARS):
             star = self.canvas.create_oval(
-                x, y, x + size, y + size, fill=self.get_star_color(), outline=""
+                0, 0, 0, 0, fill="", outline="", tags="title_stars"
             )
-            self.stars.append(
-                {
-                    "id": star,
-                    "timer": random.randint(10, 40),
-                    "base_brightness": random.choice([50, 100, 150]),
-                }
-            )
-            self.canvas.lower(star)
+            self.stars.append({"id": star, "timer": random.randint(1, 20)})
+        self.canvas.lower("title_stars")
 
     def get_star_color(self, brightness=None):
         brightness = brightness or random.choice([50, 100, 150])
         return f"#{brightness:02x}{brightness:02x}{brightness:02x}"
 
     def animate_stars(self):
-        """Atualiza dinamicamente o brilho das estrelas para efeito de animação."""
-        if not self.canvas.winfo_exists():
+        """
+        Faz as estrelas piscarem, movendo os itens do grupo de animação para estrelas sorteadas.
+        Para quando a tela de título sai de cena e pausa com a janela minimizada.
+        """
+        self.star_job = None
+        if not self.title_visible or not self.canvas.winfo_exists():
+            return
+        if not self.canvas.winfo_viewable():
+            # Retomada pelo evento <Map> quando a janela voltar a ser exibida
             return
 
         for star in self.stars:
             star["timer"] -= 1
 
             if star["timer"] <= 0:
-                new_brightness = star["base_brightness"] + random.randint(-20, 30)
+                x, y, size, base_brightness, _ = random.choice(self.title_stars)
+                new_brightness = base_brightness + random.randint(-20, 30)
                 new_brightness = max(30, min(new_brightness, 180))
 
+                self.canvas.coords(star["id"], x, y, x + size, y + size)
                 self.canvas.itemconfig(
                     star["id"], fill=self.get_star_color(new_brightness)
                 )
                 star["timer"] = random.randint(15, 25)
 
-        self.master.after(100, self.animate_stars)
+        self.star_job = self.master.after(100, self.animate_stars)
+
+    def stop_star_animation(self):
+        """Encerra a animação da tela de título."""
+        self.title_visible = False
+        if self.star_job is not None:
+            self.master.after_cancel(self.star_job)
+            self.star_job = None
+
+    def on_map(self, event):
+        """Retoma a animação das estrelas quando a janela volta a ser exibida."""
+        if event.widget is self.master and self.title_visible and self.star_job is None:
+            self.animate_stars()
 
     def draw_title(self):
         """Desenha o título 'SPACE SNAKE' com camadas de cor para um efeito de sombra."""
@@ -2140,12 +5321,13 @@ class SnakeGame:
         """
         Inicia o jogo, reiniciando variáveis de controle, redesenhando canvas e começando o loop principal.
         """
+        self.stop_star_animation()
         self.canvas.delete("all")
+        self.renderer.reset()
+        self.particles.reset()
         self.game_active = True
         self.game_paused = False
-        self.snake = [(200, 200), (220, 200), (240, 200)]
-        self.direction = "right"
-        self.direction_queue = []
+        self.reset_snake()
         self.apple = self.generate_apple()
         self.score = 0
         self.apples_eaten = 0
@@ -2155,50 +5337,44 @@ class SnakeGame:
         self.draw_snake()
         self.draw_apple()
         self.update_score_display()
-        self.update()
+        self.start_loop()
 
     def draw_stars(self):
-        """Desenha estrelas no fundo do canvas com efeito de profundidade."""
-        for _ in range(150):  # Aumentado o número de estrelas
-            x = random.randint(0, 400)
-            y = random.randint(0, 400)
-            size = random.randint(1, 3)
-            # Criar estrelas com diferentes níveis de brilho para dar sensação de profundidade
-            brightness = random.randint(100, 255)
-            # Estrelas menores ficam mais escuras para simular distância
-            if size == 1:
-                brightness = random.randint(100, 180)
-            elif size == 3:
-                brightness = random.randint(200, 255)
-
-            # Adicionar pequeno brilho ao redor das estrelas maiores
-            if size >= 2 and random.random() > 0.7:
-                glow_size = size + random.randint(1, 3)
-                # Corrigido: Usar int() para converter valores divididos por float para inteiro
-                glow_brightness = int(brightness // 2)  # Metade do brilho para o brilho
-                self.canvas.create_oval(
-                    x - glow_size // 2,
-                    y - glow_size // 2,
-                    x + size + glow_size // 2,
-                    y + size + glow_size // 2,
-                    fill="",
-                    outline=f"#{glow_brightness:02x}{glow_brightness:02x}{glow_brightness:02x}",
-                    width=1,
-                )
-
-            self.canvas.create_oval(
-                x,
-                y,
-                x + size,
-                y + size,
-                fill=f"#{brightness:02x}{brightness:02x}{brightness:02x}",
-                outline="",
-            )
+        """Desenha estrelas no fundo do canvas com efeito de profundidade (imagem gerada uma vez)."""
+        if "game" not in self.starfields:
+            stars = []
+            for _ in range(150):  # Aumentado o número de estrelas
+                x = random.randint(0, 400)
+                y = random.randint(0, 400)
+                size = random.randint(1, 3)
+                # Criar estrelas com diferentes níveis de brilho para dar sensação de profundidade
+                brightness = random.randint(100, 255)
+                # Estrelas menores ficam mais escuras para simular distância
+                if size == 1:
+                    brightness = random.randint(100, 180)
+                elif size == 3:
+                    brightness = random.randint(200, 255)
+
+                # Adicionar pequeno brilho ao redor das estrelas maiores
+                glow_size = 0
+                if size >= 2 and random.random() > 0.7:
+                    glow_size = size + random.randint(1, 3)
+                stars.append((x, y, size, brightness, glow_size))
+            self.starfields["game"] = self.render_starfield(stars)
+
+        self.canvas.create_image(
+            0, 0, image=self.starfields["game"], anchor="nw", tags="stars"
+        )
+        self.canvas.lower("stars")
 
     def generate_apple(self):
-        # Usa as variáveis de dimensão para garantir que a maçã apareça dentro dos limites corretos
-        x = random.randint(0, (self.game_width // self.cell_size) - 1) * self.cell_size
-        y = random.randint(0, (self.game_height // self.cell_size) - 1) * self.cell_size
+        # Sorteia apenas células livres (fora da cobra e do powerup) dentro dos limites do campo
+        exclude = (self.active_powerup["pos"],) if self.active_powerup else ()
+        cell = self.random_free_cell(exclude)
+        if cell is None:
+            self.apple_craters = []
+            return None
+        x, y = cell
         self.planet_color = random.choice(
             [
                 ("#0047AB", "#89CFF0", "#00008B"),
@@ -2216,127 +5392,17 @@ class SnakeGame:
         return (x, y)
 
     def draw_snake(self):
-        self.canvas.delete("snake")
-
-        # Cor base da cobra depende do powerup ativo
-        if self.powerup_active == "invincible":
-            base_color = "#FFD700"  # Dourado para invencibilidade
-            glow_color = "#FFFFA0"  # Brilho amarelo claro
-            shadow_color = "#B8860B"  # Sombra dourada escura
-        else:
-            base_color = "#00CC00"  # Verde vivo
-            glow_color = "#80FF80"  # Brilho verde claro
-            shadow_color = "#006600"  # Sombra verde escura
-
-        # Desenha cada segmento da cobra
-        for i, (x, y) in enumerate(self.snake):
-            # Cria um efeito de sombra projetada para profundidade
-            offset = 3
-            self.canvas.create_rectangle(
-                x + offset,
-                y + offset,
-                x + 20 + offset,
-                y + 20 + offset,
-                fill="#222222",
-                outline="",
-                tag="snake",  # type: ignore
-            )  # type: ignore
-
-            # Desenha o segmento principal com gradiente simulado
-            self.canvas.create_rectangle(
-                x,
-                y,
-                x + 20,
-                y + 20,
-                fill=base_color,
-                outline=shadow_color,
-                width=1,
-                tag="snake",  # type: ignore
-            )  # type: ignore
-
-            # Se for a cabeça da cobra (último elemento)
-            if i == len(self.snake) - 1:
-                # Olhos da cobra
-                eye_offset = 5
-                # Determina a posição dos olhos baseado na direção
-                if self.direction == "right":
-                    eyes = [(x + 15, y + 5), (x + 15, y + 15)]
-                elif self.direction == "left":
-                    eyes = [(x + 5, y + 5), (x + 5, y + 15)]
-                elif self.direction == "up":
-                    eyes = [(x + 5, y + 5), (x + 15, y + 5)]
-                else:  # down
-                    eyes = [(x + 5, y + 15), (x + 15, y + 15)]
-
-                # Desenha os olhos
-                for ex, ey in eyes:
-                    # Contorno preto do olho
-                    self.canvas.create_oval(
-                        ex - 3,
-                        ey - 3,
-                        ex + 3,
-                        ey + 3,
-                        fill="white",
-                        outline="black",
-                        width=1,
-                        tag="snake",  # type: ignore
-                    )  # type: ignore
-                    # Pupila
-                    self.canvas.create_oval(
-                        ex - 1,
-                        ey - 1,
-                        ex + 1,
-                        ey + 1,
-                        fill="black",
-                        outline="",
-                        tag="snake",  # type: ignore
-                    )  # type: ignore
-
-            # Reflexo superior-esquerdo (efeito de luz)
-            if i < len(self.snake) - 1 or self.direction in ["down", "right"]:
-                self.canvas.create_polygon(
-                    x, y, x + 6, y, x, y + 6, fill=glow_color, outline="", tag="snake"  # type: ignore
-                )  # type: ignore
-
-            # Padrão de escamas na cobra (linhas horizontais e verticais)
-            if i % 2 == 0:  # Alterna o padrão das escamas
-                for j in range(4):
-                    self.canvas.create_line(
-                        x + 5 * j,
-                        y,
-                        x + 5 * j,
-                        y + 20,
-                        fill=shadow_color,
-                        width=1,
-                        tag="snake",  # type: ignore
-                    )  # type: ignore
-            else:
-                for j in range(4):
-                    self.canvas.create_line(
-                        x,
-                        y + 5 * j,
-                        x + 20,
-                        y + 5 * j,
-                        fill=shadow_color,
-                        width=1,
-                        tag="snake",  # type: ignore
-                    )  # type: ignore
-
-            # Adiciona um detalhe de brilho se for invencível
-            if self.powerup_active == "invincible" and random.random() > 0.7:
-                sparkle_x = x + random.randint(5, 15)
-                sparkle_y = y + random.randint(5, 15)
-                self.canvas.create_text(
-                    sparkle_x,
-                    sparkle_y,
-                    text="✦",
-                    fill="white",
-                    font=("Arial", 8),
-                    tag="snake",  # type: ignore
-                )  # type: ignore
+        self.renderer.render(
+            self.snake,
+            self.moves,
+            self.direction,
+            self.powerup_active == "invincible",
+        )
 
     def draw_apple(self):
         self.canvas.delete("apple")
+        if self.apple is None:
+            return
         x, y = self.apple
         size = 20
         base, mid, dark = self.planet_color
@@ -2429,14 +5495,83 @@ class SnakeGame:
                 remaining = int(self.powerup_end_time - time.time())
                 powerup_text = f" | {self.powerup_active.capitalize()} ({remaining}s)"
 
+        # Desempenho medido do laço: quadros desenhados por segundo e atraso médio dos passos
+        stats_text = ""
+        if len(self.frame_times) >= 2:
+            elapsed = self.frame_times[-1] - self.frame_times[0]
+            fps = (len(self.frame_times) - 1) / elapsed if elapsed > 0 else 0
+            jitter = sum(self.tick_delays) / len(self.tick_delays) * 1000
+            stats_text = f" | {fps:.0f} FPS | Jitter: {jitter:.1f} ms"
+
         self.score_display.config(
-            text=f"Pontuação: {self.score} | Velocidade: {speed_percent}%{powerup_text}"
+            text=f"Pontuação: {self.score} | Velocidade: {speed_percent}%{powerup_text}{stats_text}"
         )
 
+    def start_loop(self):
+        """(Re)inicia o laço do jogo sem acumular atraso (ex.: ao começar ou ao sair da pausa)."""
+        self.next_tick = None
+        self.skipped_frames = 0
+        self.frame_times.clear()
+        self.tick_delays.clear()
+        self.schedule_tick(0)
+
+    def schedule_tick(self, delay):
+        """Agenda o próximo update, cancelando um agendamento pendente para nunca haver dois laços."""
+        if self.tick_job is not None:
+            self.master.after_cancel(self.tick_job)
+        self.tick_job = self.master.after(delay, self.update)
+
     def update(self):
+        """
+        Laço de passo fixo: executa os passos de lógica que venceram desde a última chamada,
+        redesenha e agenda o próximo passo para o horário previsto (medido com perf_counter),
+        de modo que o tempo de desenho não se soma ao intervalo entre passos.
+        Quando está atrasado, o jogo pula quadros de desenho, nunca passos de lógica
+        (até SNAKE_MAX_CATCHUP_STEPS por chamada; além disso, o atraso é descartado).
+        """
+        self.tick_job = None
         if not self.game_active or self.game_paused:
             return
 
+        now = time.perf_counter()
+        if self.next_tick is None:
+            self.next_tick = now
+        if now < self.next_tick:
+            # O after disparou um pouco antes do previsto (arredondamento para ms)
+            self.schedule_tick(int((self.next_tick - now) * 1000) + 1)
+            return
+
+        self.tick_delays.append(now - self.next_tick)
+        steps = 0
+        while self.next_tick <= now and steps < SNAKE_MAX_CATCHUP_STEPS:
+            if not self.step():
+                return  # Fim de jogo
+            self.next_tick += self.speed / 1000
+            steps += 1
+        if self.next_tick <= now:
+            # Atraso grande (ex.: janela arrastada): descarta em vez de acelerar o jogo
+            self.next_tick = now + self.speed / 1000
+
+        # Partículas avançam a cada chamada, mesmo quando o desenho é pulado
+        self.particles.advance()
+        behind = time.perf_counter() >= self.next_tick
+        if not behind or self.skipped_frames >= SNAKE_MAX_SKIPPED_FRAMES:
+            self.render()
+            self.frame_times.append(time.perf_counter())
+            self.skipped_frames = 0
+        else:
+            self.skipped_frames += 1
+
+        delay = max(0, int((self.next_tick - time.perf_counter()) * 1000))
+        self.schedule_tick(delay)
+
+    def step(self):
+        """
+        Avança um passo da lógica do jogo (powerups, direção, movimento e colisões).
+
+        Retorna:
+            bool: False se o passo terminou o jogo.
+        """
         if self.powerup_active and time.time() > self.powerup_end_time:
             self.deactivate_powerup()
 
@@ -2448,7 +5583,7 @@ class SnakeGame:
             self.spawn_powerup()
 
         if self.direction_queue:
-            new_direction = self.direction_queue.pop(0)
+            new_direction = self.direction_queue.popleft()
             if (
                 new_direction == "up"
                 and self.direction != "down"
@@ -2486,27 +5621,32 @@ class SnakeGame:
             new_head = (x, y)
 
         self.snake.append(new_head)
+        self.occupied[new_head] += 1
+        self.moves += 1
 
-        if self.snake[-1] == self.apple:
+        if new_head == self.apple:
             self.apples_eaten += 1
             self.score += 10
             self.apple = self.generate_apple()
         else:
-            self.snake.pop(0)
+            tail = self.snake.popleft()
+            self.occupied[tail] -= 1
+            if not self.occupied[tail]:
+                del self.occupied[tail]
 
         # Verificação de colisão - modificada para o modo invencível
         if not self.powerup_active == "invincible":
             # No modo normal, qualquer colisão causa game over
             # Usa as variáveis de dimensão para verificar os limites
             if (
-                self.snake[-1][0] < 0
-                or self.snake[-1][0] >= self.game_width
-                or self.snake[-1][1] < 0
-                or self.snake[-1][1] >= self.game_height
-                or self.snake[-1] in self.snake[:-1]
+                new_head[0] < 0
+                or new_head[0] >= self.game_width
+                or new_head[1] < 0
+                or new_head[1] >= self.game_height
+                or self.occupied[new_head] > 1
             ):
                 self.game_over()
-                return
+                return False
         # Modo invencível - não há verificação de colisão (removida a verificação com o corpo)
 
         if (
@@ -2514,7 +5654,10 @@ class SnakeGame:
             and (new_head[0], new_head[1]) == self.active_powerup["pos"]
         ):
             self.activate_powerup()
+        return True
 
+    def render(self):
+        """Redesenha a cobra, a maçã, o powerup e os efeitos no estado atual."""
         self.draw_snake()
         self.draw_apple()
 
@@ -2527,40 +5670,17 @@ class SnakeGame:
         if self.powerup_active == "invincible" and random.random() > 0.8:
             # Adiciona um rastro de partículas para invencibilidade
             x, y = self.snake[-1]
-            sparkle_x = x + random.randint(-5, 25)
-            sparkle_y = y + random.randint(-5, 25)
-            sparkle = self.canvas.create_text(
-                sparkle_x,
-                sparkle_y,
-                text="✦",
-                fill="#FFD700",
-                font=("Arial", 8),
-                tags="effect",
+            self.particles.spawn(
+                "sparkle", x + random.randint(-5, 25), y + random.randint(-5, 25)
             )
-            # Remove o efeito após um tempo
-            self.master.after(300, lambda s=sparkle: self.canvas.delete(s))
 
         elif self.powerup_active == "speed" and random.random() > 0.8:
-            # Adiciona um rastro de velocidade
+            # Adiciona um rastro de velocidade (desaparece gradualmente)
             if len(self.snake) >= 2:
                 x, y = self.snake[-2]  # Posição anterior da cabeça
-                trail = self.canvas.create_oval(
-                    x + 5,
-                    y + 5,
-                    x + 15,
-                    y + 15,
-                    fill="#87CEFA",
-                    outline="",
-                    tags="effect",
-                )
-                # Desaparece gradualmente
-                self.master.after(
-                    100, lambda t=trail: self.canvas.itemconfig(t, fill="#ADD8E6")
-                )
-                self.master.after(200, lambda t=trail: self.canvas.delete(t))
+                self.particles.spawn("trail", x + 5, y + 5, x + 15, y + 15)
 
         self.update_score_display()
-        self.master.after(self.speed, self.update)
 
     def spawn_powerup(self):
         types = [
@@ -2570,18 +5690,10 @@ class SnakeGame:
         ]
         power_type, color, duration = random.choice(types)
 
-        # Usa as variáveis de dimensão para o posicionamento
-        while True:
-            x = (
-                random.randint(0, (self.game_width // self.cell_size) - 1)
-                * self.cell_size
-            )
-            y = (
-                random.randint(0, (self.game_height // self.cell_size) - 1)
-                * self.cell_size
-            )
-            if (x, y) not in self.snake and (x, y) != self.apple:
-                break
+        cell = self.random_free_cell((self.apple,))
+        if cell is None:
+            return
+        x, y = cell
 
         self.active_powerup = {
             "type": power_type,
@@ -2703,12 +5815,18 @@ class SnakeGame:
             self.game_paused = not self.game_paused
             status = "PAUSADO | " if self.game_paused else ""
             self.score_display.config(text=f"{status}Pontuação: {self.score}")
-            if not self.game_paused:
-                self.update()
+            if self.game_paused:
+                if self.tick_job is not None:
+                    self.master.after_cancel(self.tick_job)
+                    self.tick_job = None
+            else:
+                self.start_loop()
 
     def game_over(self):
         self.game_active = False
         self.canvas.delete("all")
+        self.renderer.reset()
+        self.particles.reset()
 
         # Fundo mais detalhado para a tela de fim de jogo
         self.draw_stars()
@@ -2870,8 +5988,337 @@ class SnakeGame:
         self.direction_queue.append("right")
 
 
+class SnippetService:
+    """
+    Acesso somente leitura aos textos para a linha de comando e a API local, sem iniciar o Tk nem o pygame.
+    Os textos são recarregados quando texts.json/texts.db mudam (ex.: editados pela janela principal).
+
+    Parâmetros:
+        base_dir (str): Pasta dos arquivos de dados (padrão: a do executável).
+    """
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or os.path.dirname(sys.executable)
+        self.lock = threading.Lock()
+        self.text_manager = None
+        self.signature = None
+        # Rótulo normalizado -> IDs e categoria normalizada -> nome da categoria
+        self.label_ids = {}
+        self.category_names = {}
+
+    def _data_signature(self):
+        """Datas de modificação dos arquivos de textos, usadas para detectar alterações."""
+        signature = []
+        for name in (TEXTS_FILE, TEXTS_DB_FILE, TEXTS_DB_FILE + "-wal"):
+            try:
+                signature.append(os.stat(os.path.join(self.base_dir, name)).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _manager(self):
+        """Retorna o TextManager, recarregando-o se os arquivos de dados mudaram."""
+        signature = self._data_signature()
+        if self.text_manager is None or signature != self.signature:
+            config = ConfigManager(base_dir=self.base_dir).config
+            if self.text_manager is not None:
+                self.text_manager.close()
+            self.text_manager = TextManager(
+                storage=config.get("texts_storage", "json"),
+                base_dir=self.base_dir,
+                read_only=True,
+            )
+            self.signature = signature
+            self.label_ids = {}
+            for text_id in self.text_manager.ids:
+                label = normalize_search_text(self.text_manager.get_text(text_id)[1])
+                self.label_ids.setdefault(label, []).append(text_id)
+            self.category_names = {
+                normalize_search_text(category): category
+                for category in self.text_manager.categories
+            }
+        return self.text_manager
+
+    def find(self, label=None, category=None, query=None):
+        """
+        Busca textos por rótulo, categoria e/ou consulta (sem diferenciar maiúsculas e acentos).
+        Com consulta, o resultado vem por relevância; sem ela, na ordem da lista de textos.
+
+        Retorna:
+            list: Dicionários com label, category e text.
+        """
+        with self.lock:
+            manager = self._manager()
+            ids = None  # None = nenhum filtro aplicado ainda
+            if label:
+                ids = self.label_ids.get(normalize_search_text(label), [])
+            if category:
+                name = self.category_names.get(normalize_search_text(category))
+                if ids is None:
+                    ids = manager.ids_in_category(name)
+                else:
+                    in_category = manager.category_ids.get(name, {})
+                    ids = [text_id for text_id in ids if text_id in in_category]
+            if query:
+                ranked = manager.search(query)
+                if ids is not None:
+                    allowed = set(ids)
+                    ranked = [text_id for text_id in ranked if text_id in allowed]
+                ids = ranked
+            if ids is None:
+                ids = manager.ids
+            results = []
+            for text_id in ids:
+                text, text_label, text_category = manager.get_text(text_id)
+                results.append(
+                    {"label": text_label, "category": text_category, "text": text}
+                )
+            return results
+
+    def categories(self):
+        """Retorna as categorias com a quantidade de textos de cada uma."""
+        with self.lock:
+            manager = self._manager()
+            return [
+                {"category": category, "count": manager.category_count(category)}
+                for category in manager.categories
+            ]
+
+
+def serve_snippets(service, port=SNIPPET_API_PORT):
+    """
+    Publica os textos em uma API HTTP/JSON acessível apenas pelo próprio computador (127.0.0.1).
+
+    Rotas:
+        GET /textos?rotulo=&categoria=&busca=  Lista de textos em JSON.
+        GET /texto?rotulo=&categoria=&busca=   Somente o primeiro texto encontrado, em texto puro.
+        GET /categorias                        Categorias e quantidades, em JSON.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+
+    class SnippetRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            filters = {
+                "label": params.get("rotulo"),
+                "category": params.get("categoria"),
+                "query": params.get("busca"),
+            }
+            try:
+                if url.path == "/textos":
+                    self._send(
+                        200,
+                        "application/json",
+                        json.dumps(service.find(**filters), ensure_ascii=False),
+                    )
+                elif url.path == "/texto":
+                    results = service.find(**filters)
+                    if results:
+                        self._send(200, "text/plain", results[0]["text"])
+                    else:
+                        self._send(404, "text/plain", "Texto não encontrado")
+                elif url.path == "/categorias":
+                    self._send(
+                        200,
+                        "application/json",
+                        json.dumps(service.categories(), ensure_ascii=False),
+                    )
+                else:
+                    self._send(404, "text/plain", "Rota desconhecida")
+            except Exception as e:
+                self._send(500, "text/plain", f"Erro: {e}")
+
+        def _send(self, status, content_type, body):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            print(f"[API] {self.address_string()} {format % args}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), SnippetRequestHandler)
+    print(
+        f"API de textos em http://127.0.0.1:{server.server_port} (Ctrl+C para encerrar)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def run_cli(argv):
+    """
+    Executa o SuporteApp pela linha de comando, sem abrir a janela.
+
+    Parâmetros:
+        argv (list): Argumentos (sem o nome do programa).
+
+    Retorna:
+        int: Código de saída (0 = sucesso, 1 = nada encontrado).
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="SuporteApp",
+        description="Consulta os textos do SuporteApp sem abrir a janela.",
+    )
+    parser.add_argument(
+        "--obter", metavar="ROTULO", help="imprime o texto do botão com este rótulo"
+    )
+    parser.add_argument("--categoria", help="filtra pela categoria")
+    parser.add_argument(
+        "--buscar", metavar="CONSULTA", help="busca por rótulo, conteúdo ou categoria"
+    )
+    parser.add_argument(
+        "--listar", action="store_true", help="lista rótulos e categorias dos textos"
+    )
+    parser.add_argument("--categorias", action="store_true", help="lista as categorias")
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    parser.add_argument(
+        "--servir", action="store_true", help="inicia a API local (127.0.0.1)"
+    )
+    parser.add_argument(
+        "--porta", type=int, default=SNIPPET_API_PORT, help="porta da API local"
+    )
+    parser.add_argument(
+        "--saida",
+        metavar="ARQUIVO",
+        help="grava a saída em um arquivo (útil no executável sem console)",
+    )
+    parser.add_argument(
+        "--pasta", help="pasta dos arquivos de dados (padrão: a do executável)"
+    )
+    parser.add_argument(
+        "--bench",
+        type=int,
+        metavar="N",
+        help="repete a consulta N vezes e mostra o tempo",
+    )
+    parser.add_argument(
+        "--gerar-patch",
+        nargs=3,
+        metavar=("ANTIGO", "NOVO", "PATCH"),
+        help="gera o patch binário entre dois executáveis (publicação de versões)",
+    )
+    args = parser.parse_args(argv)
+
+    output = None
+    try:
+        output = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+        if output is None:
+            return 2  # Executável sem console e sem --saida: não há onde escrever
+        if args.saida:
+            # O executável sem console não tem stdout; mensagens também vão para o arquivo
+            sys.stdout = output
+
+        if args.gerar_patch:
+            old_path, new_path, patch_path = args.gerar_patch
+            stats = build_delta(old_path, new_path, patch_path)
+            print(
+                f"Patch gerado: {stats['size']} bytes "
+                f"({stats['copied']} bytes reaproveitados, {stats['inserted']} bytes novos)"
+            )
+            print(f"sha256 do patch: {file_sha256(patch_path)}")
+            print(f"sha256 do novo executável: {file_sha256(new_path)}")
+            return 0
+
+        service = SnippetService(args.pasta)
+        if args.servir:
+            serve_snippets(service, args.porta)
+            return 0
+
+        if args.categorias:
+            categories = service.categories()
+            if args.json:
+                print(json.dumps(categories, ensure_ascii=False, indent=2))
+            else:
+                for item in categories:
+                    print(f"{item['category']} ({item['count']})")
+            return 0
+
+        filters = {
+            "label": args.obter,
+            "category": args.categoria,
+            "query": args.buscar,
+        }
+        if args.bench:
+            begin = time.perf_counter()
+            service.find(**filters)
+            load_time = time.perf_counter() - begin
+            durations = []
+            for _ in range(args.bench):
+                begin = time.perf_counter()
+                service.find(**filters)
+                durations.append(time.perf_counter() - begin)
+            print(
+                f"Primeira consulta (inclui carga dos textos): {load_time * 1000:.2f} ms"
+            )
+            print(
+                f"{args.bench} consultas: média {sum(durations) / len(durations) * 1000:.3f} ms, "
+                f"máximo {max(durations) * 1000:.3f} ms"
+            )
+            return 0
+
+        results = service.find(**filters)
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+        elif args.obter and not args.listar:
+            if results:
+                print(results[0]["text"])
+        else:
+            for item in results:
+                print(f"[{item['category']}] {item['label']}")
+        return 0 if results else 1
+    except OSError as e:
+        # Arquivo de saída inválido, porta em uso, executável não encontrado etc.
+        stream = sys.stderr or output
+        if stream is not None:
+            print(f"Erro: {e}", file=stream)
+        return 2
+    finally:
+        if args.saida:
+            sys.stdout = sys.__stdout__
+            if output is not None:
+                output.close()
+
+
 if __name__ == "__main__":
-    cleanup_old_temp_dirs()  # Função de limpeza de pasta temporaria MEI na inicialização
-    root = tk.Tk()
-    app = SupportApp(root)
+    if len(sys.argv) > 1:
+        # Com argumentos, roda pela linha de comando (sem Tk nem pygame)
+        sys.exit(run_cli(sys.argv[1:]))
+
+    # Perfil completo da execução com cProfile, ativado pela variável de ambiente
+    profiler = None
+    profile_target = os.environ.get(PROFILE_ENV_VAR)
+    if profile_target:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    with perf_monitor.phase("tk.Tk"):
+        root = tk.Tk()
+    with perf_monitor.phase("SupportApp"):
+        app = SupportApp(root)
+    # O relatório sai quando a janela já foi desenhada e o loop de eventos está livre
+    root.after_idle(app.report_startup)
+    # Limpeza das pastas temporárias MEI antigas, em segundo plano e depois que a janela já apareceu
+    root.after(CLEANUP_DELAY_MS, start_background_cleanup)
     root.mainloop()
+
+    if profiler:
+        profiler.disable()
+        profile_path = (
+            os.path.join(os.path.dirname(sys.executable), "suporteapp.prof")
+            if profile_target == "1"
+            else profile_target
+        )
+        profiler.dump_stats(profile_path)
+        print(f"Perfil do cProfile gravado em {profile_path}")